@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+"""
+    -cp single file throughput against a local fake WebHDFS
+
+    compares the old sequential read-then-write loop with the pipelined
+    transfer used by CommandBase._transfer_hdfs_file
+
+    usage: python benchmarks/copy_throughput.py [--size-mb 64] [--bandwidth-mb 32]
+"""
+
+import os
+import sys
+import time
+import socket
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from hdfs import InsecureClient
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+import hdfs_kernel.utils.configuration as config
+from hdfs_kernel.command import CommandBase
+from hdfs_kernel.connections.manager import HdfsSessionManager
+from fake_webhdfs import serve
+
+NAMESERVICE = "bench"
+
+
+
+class SmallBufferAdapter(HTTPAdapter):
+    """
+        disable socket buffer autotuning on loopback, multi-MB kernel
+        buffers would overlap the sequential copy on their own
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024),
+            (socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+        ]
+        super(SmallBufferAdapter, self).init_poolmanager(*args, **kwargs)
+
+
+def build_client(url, nameservice):
+    session = requests.Session()
+    session.mount("http://", SmallBufferAdapter())
+    return InsecureClient(url, user="bench", session=session)
+
+
+def sequential_copy(client, src_path, dest_path, chunk_size):
+    with client.read(src_path, chunk_size=chunk_size) as reader_generator:
+        client.write(dest_path, data=reader_generator, overwrite=True)
+
+
+def pipelined_copy(command, src_path, dest_path):
+    command._transfer_hdfs_file(NAMESERVICE, src_path, NAMESERVICE, dest_path, overwrite=True)
+
+
+def measure(func, *args):
+    start = time.time()
+    func(*args)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=64)
+    parser.add_argument("--bandwidth-mb", type=int, default=32,
+                        help="per stream DataNode bandwidth of the fake server")
+    parser.add_argument("--queue-depth", type=int, default=config.copy_queue_depth())
+    options = parser.parse_args()
+
+    size = options.size_mb * 1024 * 1024
+    server, url = serve(bandwidth=options.bandwidth_mb * 1024 * 1024)
+    fs = server.RequestHandlerClass.fs
+    fs.write("/bench/src.bin", os.urandom(size))
+
+    config.override("copy_queue_depth", options.queue_depth)
+    session_manager = HdfsSessionManager(client_class=lambda nameservice: build_client(url, nameservice))
+    client = session_manager(NAMESERVICE)
+    command = CommandBase(session_manager)
+
+    sequential = measure(sequential_copy, client, "/bench/src.bin", "/bench/seq.bin",
+                         config.copy_chunk_size())
+    pipelined = measure(pipelined_copy, command, "/bench/src.bin", "/bench/pipe.bin")
+    assert fs.files["/bench/pipe.bin"]["data"] == fs.files["/bench/src.bin"]["data"]
+
+    for name, seconds in (("sequential", sequential), ("pipelined", pipelined)):
+        print("%-10s %6.2fs %8.1f MB/s" % (name, seconds, options.size_mb / seconds))
+    print("speedup    %6.2fx" % (sequential / pipelined))
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+"""
+    Minimal in-memory WebHDFS server for local benchmarks.
+
+    Supports the operations the kernel issues: GETFILESTATUS, LISTSTATUS,
+    LISTSTATUS_BATCH, GETCONTENTSUMMARY, OPEN, CREATE, APPEND, CONCAT, MKDIRS,
+    RENAME, DELETE, SETPERMISSION and SETOWNER. Data node traffic is served by
+    the same process, `latency` seconds are slept per request and
+    `bandwidth` bytes per second are enforced on OPEN/CREATE bodies.
+"""
+
+import json
+import socket
+import posixpath
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote
+
+PREFIX = "/webhdfs/v1"
+DATANODE_PREFIX = "/datanode"
+
+
+class FakeFileSystem(object):
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.files = {}
+        self.dirs = {"/": self._meta()}
+
+    def _meta(self, permission="755"):
+        return {"permission": permission, "owner": "hdfs", "group": "supergroup",
+                "modificationTime": int(time.time() * 1000)}
+
+    def makedirs(self, path):
+        with self.lock:
+            while path not in self.dirs:
+                if path in self.files:
+                    raise IOError("%s is a file" % path)
+                self.dirs[path] = self._meta()
+                path = posixpath.dirname(path)
+
+    def write(self, path, data, append=False):
+        self.makedirs(posixpath.dirname(path))
+        with self.lock:
+            if append:
+                self.files[path]["data"] += data
+            else:
+                meta = self._meta("644")
+                meta["data"] = data
+                self.files[path] = meta
+
+    def status(self, path):
+        name = posixpath.basename(path)
+        if path in self.dirs:
+            meta = self.dirs[path]
+            return dict(pathSuffix=name, type="DIRECTORY", length=0, replication=0,
+                        blockSize=0, accessTime=0, fileId=0, childrenNum=len(self.children(path)),
+                        permission=meta["permission"], owner=meta["owner"], group=meta["group"],
+                        modificationTime=meta["modificationTime"])
+        if path in self.files:
+            meta = self.files[path]
+            return dict(pathSuffix=name, type="FILE", length=len(meta["data"]), replication=3,
+                        blockSize=134217728, accessTime=0, fileId=0, childrenNum=0,
+                        permission=meta["permission"], owner=meta["owner"], group=meta["group"],
+                        modificationTime=meta["modificationTime"])
+        return None
+
+    def children(self, path):
+        prefix = path.rstrip("/") + "/"
+        names = set()
+        for p in list(self.dirs) + list(self.files):
+            if p != path and p.startswith(prefix) and "/" not in p[len(prefix):]:
+                names.add(p[len(prefix):])
+        return sorted(names)
+
+    def delete(self, path):
+        with self.lock:
+            prefix = path.rstrip("/") + "/"
+            found = path in self.files or path in self.dirs
+            for table in (self.files, self.dirs):
+                for p in list(table):
+                    if p == path or p.startswith(prefix):
+                        del table[p]
+            return found
+
+    def rename(self, src, dst):
+        if dst in self.dirs:
+            dst = posixpath.join(dst, posixpath.basename(src))
+        with self.lock:
+            if posixpath.dirname(dst) not in self.dirs:
+                return False
+            prefix = src.rstrip("/") + "/"
+            for table in (self.files, self.dirs):
+                for p in list(table):
+                    if p == src:
+                        table[dst] = table.pop(p)
+                    elif p.startswith(prefix):
+                        table[dst + "/" + p[len(prefix):]] = table.pop(p)
+            return True
+
+    def summary(self, path):
+        if path in self.files:
+            return dict(directoryCount=0, fileCount=1, length=len(self.files[path]["data"]),
+                        quota=-1, spaceConsumed=3 * len(self.files[path]["data"]), spaceQuota=-1)
+        prefix = path.rstrip("/") + "/"
+        dirs = [p for p in self.dirs if p == path or p.startswith(prefix)]
+        files = [m for p, m in self.files.items() if p.startswith(prefix)]
+        length = sum(len(m["data"]) for m in files)
+        return dict(directoryCount=len(dirs), fileCount=len(files), length=length,
+                    quota=-1, spaceConsumed=3 * length, spaceQuota=-1)
+
+
+class WebHdfsHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+    fs = None
+    latency = 0.0
+    bandwidth = None
+    batch_size = 1000
+
+    def setup(self):
+        BaseHTTPRequestHandler.setup(self)
+        # keep kernel socket buffers small, otherwise they hide the
+        # difference between sequential and overlapped transfers
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 64 * 1024)
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 64 * 1024)
+
+    def log_message(self, *args):
+        pass
+
+    def _throttle(self, nbytes):
+        if self.bandwidth:
+            time.sleep(float(nbytes) / self.bandwidth)
+
+    def _send_json(self, payload, code=200):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _not_found(self, path):
+        self._send_json({"RemoteException": {
+            "exception": "FileNotFoundException",
+            "javaClassName": "java.io.FileNotFoundException",
+            "message": "File does not exist: %s" % path}}, code=404)
+
+    def _read_exactly(self, size):
+        # throttle while reading so a slow DataNode pushes back on the sender
+        data = []
+        step = 64 * 1024
+        while size > 0:
+            piece = self.rfile.read(min(step, size))
+            if not piece:
+                break
+            self._throttle(len(piece))
+            data.append(piece)
+            size -= len(piece)
+        return b"".join(data)
+
+    def _read_body(self):
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int(self.rfile.readline().strip(), 16)
+                if not size:
+                    self.rfile.readline()
+                    break
+                chunks.append(self._read_exactly(size))
+                self.rfile.readline()
+            return b"".join(chunks)
+        length = int(self.headers.get("Content-Length") or 0)
+        return self._read_exactly(length)
+
+    def _parse(self):
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        return url.path, query
+
+    def _route(self, method):
+        if self.latency:
+            time.sleep(self.latency)
+        url_path, query = self._parse()
+        if url_path.startswith(DATANODE_PREFIX):
+            return self._datanode(method, url_path[len(DATANODE_PREFIX):], query)
+
+        path = posixpath.normpath(url_path[len(PREFIX):] or "/")
+        op = query.get("op", "").upper()
+        fs = self.fs
+        if method in ("PUT", "POST"):
+            self._read_body()
+
+        if op == "GETFILESTATUS":
+            status = fs.status(path)
+            return self._send_json({"FileStatus": status}) if status else self._not_found(path)
+        if op in ("LISTSTATUS", "LISTSTATUS_BATCH"):
+            status = fs.status(path)
+            if not status:
+                return self._not_found(path)
+            if status["type"] == "FILE":
+                status["pathSuffix"] = ""
+                statuses = [status]
+            else:
+                statuses = [fs.status(posixpath.join(path, n)) for n in fs.children(path)]
+            if op == "LISTSTATUS":
+                return self._send_json({"FileStatuses": {"FileStatus": statuses}})
+            start_after = query.get("startAfter")
+            if start_after:
+                statuses = [s for s in statuses if s["pathSuffix"] > start_after]
+            page, rest = statuses[:self.batch_size], statuses[self.batch_size:]
+            return self._send_json({"DirectoryListing": {
+                "partialListing": {"FileStatuses": {"FileStatus": page}},
+                "remainingEntries": len(rest)}})
+        if op == "GETCONTENTSUMMARY":
+            if not fs.status(path):
+                return self._not_found(path)
+            return self._send_json({"ContentSummary": fs.summary(path)})
+        if op == "MKDIRS":
+            fs.makedirs(path)
+            return self._send_json({"boolean": True})
+        if op == "DELETE":
+            return self._send_json({"boolean": fs.delete(path)})
+        if op == "RENAME":
+            return self._send_json({"boolean": fs.rename(path, query["destination"])})
+        if op == "SETPERMISSION":
+            meta = fs.dirs.get(path) or fs.files.get(path)
+            if meta is None:
+                return self._not_found(path)
+            meta["permission"] = query.get("permission", meta["permission"])
+            return self._send_json({})
+        if op == "SETOWNER":
+            meta = fs.dirs.get(path) or fs.files.get(path)
+            if meta is None:
+                return self._not_found(path)
+            meta["owner"] = query.get("owner") or meta["owner"]
+            meta["group"] = query.get("group") or meta["group"]
+            return self._send_json({})
+        if op == "CONCAT":
+            sources = [s for s in query.get("sources", "").split(",") if s]
+            with fs.lock:
+                for source in sources:
+                    fs.files[path]["data"] += fs.files.pop(source)["data"]
+            return self._send_json({})
+        if op in ("OPEN", "CREATE", "APPEND"):
+            if op == "CREATE" and query.get("overwrite", "false") != "true" and fs.status(path):
+                return self._send_json({"RemoteException": {
+                    "exception": "FileAlreadyExistsException",
+                    "javaClassName": "org.apache.hadoop.fs.FileAlreadyExistsException",
+                    "message": "%s already exists" % path}}, code=403)
+            if op == "OPEN" and path not in fs.files:
+                return self._not_found(path)
+            location = "http://%s:%s%s%s?%s" % (
+                self.server.server_address[0], self.server.server_address[1],
+                DATANODE_PREFIX, quote(path), "&".join("%s=%s" % kv for kv in query.items()))
+            self.send_response(307)
+            self.send_header("Location", location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send_json({"RemoteException": {"exception": "UnsupportedOperationException",
+                                              "message": op}}, code=400)
+
+    def _datanode(self, method, path, query):
+        op = query.get("op", "").upper()
+        if op == "OPEN":
+            data = self.fs.files[path]["data"]
+            offset = int(query.get("offset") or 0)
+            length = query.get("length")
+            data = data[offset:offset + int(length)] if length not in (None, "None") else data[offset:]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            step = 64 * 1024
+            for i in range(0, len(data), step):
+                self._throttle(len(data[i:i + step]))
+                self.wfile.write(data[i:i + step])
+            return
+        data = self._read_body()
+        self.fs.write(path, data, append=(op == "APPEND"))
+        self.send_response(201 if op == "CREATE" else 200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self._route("GET")
+
+    def do_PUT(self):
+        self._route("PUT")
+
+    def do_POST(self):
+        self._route("POST")
+
+    def do_DELETE(self):
+        self._route("DELETE")
+
+
+def serve(latency=0.0, bandwidth=None, fs=None, port=0):
+    """
+        start a fake WebHDFS server in a daemon thread
+        @return (server, url)
+    """
+    handler = type("Handler", (WebHdfsHandler, ), {
+        "fs": fs or FakeFileSystem(),
+        "latency": latency,
+        "bandwidth": bandwidth,
+    })
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    server.handle_error = lambda request, client_address: None
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, "http://127.0.0.1:%s" % server.server_address[1]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+"""
+    Kernel start up cost: cold import of the kernel module and time to the
+    first -ls result against a local fake WebHDFS on port 50070, each run
+    in a fresh interpreter with the kernel's own session manager and client
+
+    also lists heavy modules the kernel import pulled in, pandas and the
+    kerberos client should only be imported by the first command
+
+    usage: python benchmarks/startup.py [--runs 5] [--entries 1000] [--max-import-seconds 1.0]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fake_webhdfs import serve
+
+NAMESERVICE = "bench"
+HEAVY_MODULES = ["pandas", "hdfs.ext.kerberos", "requests_kerberos"]
+
+CHILD = """
+import sys, json, time
+start = time.perf_counter()
+import hdfs_kernel.kernels.hdfs.hdfskernel
+imported = time.perf_counter()
+heavy = [name for name in %(heavy)r if name in sys.modules]
+
+import hdfs_kernel.utils.configuration as config
+from hdfs_kernel.command import CommandDispatcher
+from hdfs_kernel.connections.manager import HdfsSessionManager
+from hdfs_kernel.parsers.code_parser import HdfsCodeParser
+
+config.override_all({"default_name_service": %(nameservice)r,
+                     "web_hdfs_nodes": {%(nameservice)r: ["127.0.0.1"]}})
+session_manager = HdfsSessionManager()
+parse_result = HdfsCodeParser("hdfs dfs -ls /bench").parse()
+result = CommandDispatcher("-ls", session_manager).execute(*parse_result['args'], **parse_result['options'])
+assert result['status'], result['message']
+rows = len(result['data'])
+listed = time.perf_counter()
+
+print(json.dumps({"import": imported - start, "first_ls": listed - start, "rows": rows, "heavy": heavy}))
+"""
+
+
+def run_child():
+    code = CHILD % {"heavy": HEAVY_MODULES, "nameservice": NAMESERVICE}
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), os.environ.get("PYTHONPATH")])))
+
+    start = time.perf_counter()
+    output = subprocess.check_output([sys.executable, "-W", "ignore", "-c", code], env=env)
+    wall = time.perf_counter() - start
+
+    result = json.loads(output.decode("utf-8").strip().splitlines()[-1])
+    result["process"] = wall
+    return result
+
+
+def median(values):
+    values = sorted(values)
+    middle = len(values) // 2
+    return values[middle] if len(values) % 2 else (values[middle - 1] + values[middle]) / 2
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--entries", type=int, default=1000, help="files in the listed directory")
+    parser.add_argument("--max-import-seconds", type=float, default=None,
+                        help="exit with status 1 when the median cold import is slower")
+    options = parser.parse_args()
+
+    # the kernel client connects to port 50070 of the configured nodes
+    server, _ = serve(port=50070)
+    fs = server.RequestHandlerClass.fs
+    for index in range(options.entries):
+        fs.write("/bench/part-%05d" % index, b"x")
+
+    results = [run_child() for _ in range(options.runs)]
+    server.shutdown()
+
+    for name, key in (("cold import", "import"), ("first -ls", "first_ls"), ("process", "process")):
+        values = [result[key] for result in results]
+        print("%-12s median %6.3fs  min %6.3fs  max %6.3fs" % (name, median(values), min(values), max(values)))
+    print("rows listed  %s" % results[0]["rows"])
+
+    heavy = sorted(set(name for result in results for name in result["heavy"]))
+    print("heavy modules loaded by the kernel import: %s" % (", ".join(heavy) or "none"))
+
+    if options.max_import_seconds is not None:
+        slow = median([result["import"] for result in results]) > options.max_import_seconds
+        if slow or heavy:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
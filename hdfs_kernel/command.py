@@ -6,19 +6,29 @@
 
 import os
 import re
-import pandas
+import shutil
+import tempfile
+import time
+import codecs
+import heapq
+import itertools
 import getpass
 from datetime import datetime
-from pandas import DataFrame
-from hdfs_kernel.parsers.paths import HdfsPath
+from hdfs_kernel.parsers.paths import HdfsPath, has_glob, glob_to_regex
 from hdfs_kernel.utils import tools
+from hdfs_kernel.utils.pipeline import ChunkPipeline
+from hdfs_kernel.utils.decompress import get_decompressor
+from hdfs_kernel.utils import footers
+from hdfs_kernel.connections.cache import MetadataCache
+from hdfs_kernel.connections.walker import HdfsTreeWalker
+from hdfs_kernel.connections.globber import HdfsGlobber
 import hdfs_kernel.utils.configuration as config
-from hdfs_kernel.exceptions import CommandExecuteException
-from collections import OrderedDict
+from hdfs_kernel.exceptions import CommandExecuteException, CommandCancelledException
+from threading import Lock
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED, ALL_COMPLETED
 from hdfs_kernel.constants import HDFS_FILE_TYPE, HDFS_DIRECTORY_TYPE
 
-# set dataframe max_colwidth
-pandas.set_option("max_colwidth", 240)
 
 
 
@@ -35,17 +45,83 @@ class CommandResult(dict):
 
 class CommandBase(object):
 
-    def __init__(self, session_manager):
+    def __init__(self, session_manager, event_handler=None, cancel_token=None):
         self.session_manager = session_manager
+        # callable(event, data), lets the kernel render intermediate output
+        self.event_handler = event_handler
+        # tools.CancellationToken, set when the kernel is interrupted
+        self.cancel_token = cancel_token
+
+        # work done so far, reported when the command is interrupted
+        self.progress = {"files": 0, "bytes": 0}
+        self._progress_lock = Lock()
 
     def execute(self):
         raise NotImplemented
 
+    def emit(self, event, data):
+        if self.event_handler is not None:
+            self.event_handler(event, data)
+
+    def check_cancelled(self):
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def start_progress(self, nbytes=None, files=None):
+        """
+            set the totals of a transfer, from now on every
+            add_progress call emits a "progress" event
+        """
+        with self._progress_lock:
+            self.progress.update(total_bytes=nbytes, total_files=files, started=time.time())
+
+    def add_progress(self, files=0, nbytes=0):
+        with self._progress_lock:
+            self.progress['files'] += files
+            self.progress['bytes'] += nbytes
+            if "started" not in self.progress:
+                return
+            progress = dict(self.progress)
+
+        elapsed = max(time.time() - progress.pop("started"), 0.001)
+        rate = progress['bytes'] / elapsed
+        remaining = (progress['total_bytes'] or 0) - progress['bytes']
+        progress['rate'] = rate
+        progress['eta'] = remaining / rate if progress['total_bytes'] and rate else None
+        self.emit("progress", progress)
+
+    def progress_summary(self):
+        return "%s files, %s transferred" % (self.progress['files'],
+                                            tools.convert_size_readable(self.progress['bytes']))
+
+    def _track_chunks(self, chunks, attempt=None):
+        """
+            pass chunks through, count their bytes and
+            stop between two chunks once cancelled
+            @params attempt dict, its "bytes" sums what this call counted
+                    so a failed attempt can be taken back, see _undo_attempt
+        """
+        for chunk in chunks:
+            self.check_cancelled()
+            self.add_progress(nbytes=len(chunk))
+            if attempt is not None:
+                attempt['bytes'] += len(chunk)
+            yield chunk
+
+    def _undo_attempt(self, attempt):
+        # a retried read counts its bytes again
+        self.add_progress(nbytes=-attempt['bytes'])
+        attempt['bytes'] = 0
+
+    def _local_temp_path(self, local_path):
+        return os.path.join(os.path.dirname(local_path),
+                            ".%s.downloading" % os.path.basename(local_path))
+
     def pack_format(self, result):
         return self._trans_to_dataframe(result)
 
     def _trans_to_dataframe(self, records):
-        df = DataFrame.from_records(records)
+        df = tools.import_pandas().DataFrame.from_records(records)
         return df
 
     def _timestamp_to_str(self, timestamp):
@@ -53,6 +129,9 @@ class CommandBase(object):
                 .strftime("%Y-%m-%d %H:%M:%S")
 
     def _get_full_path(self, path, path_suffix):
+        if not path_suffix:
+            # listing of a file returns the file itself
+            return path
         return os.path.join(path, path_suffix)
 
     def _build_local_path(self, path):
@@ -70,21 +149,106 @@ class CommandBase(object):
         return local_path
 
     def _make_dir(self, path, nameservice):
-        return self.session_manager(nameservice).makedirs(path)
+        result = self.session_manager(nameservice).makedirs(path)
+        self._invalidate_path(path, nameservice)
+        return result
 
-    def _get_path_detail(self, path, nameservice):
+    def _get_path_detail(self, path, nameservice, fresh=False):
+        """
+            @params fresh skip the cache, for paths whose status is shown to the user
+            @return FileStatus or None
+        """
         client = self.session_manager(nameservice)
-        status = client.status(path, strict=False)
+        cache = self.session_manager.metadata_cache
+        if fresh:
+            status = client.status(path, strict=False)
+            cache.put(nameservice, MetadataCache.STATUS, path, status)
+            return status
+
+        status = cache.get_or_load(nameservice, MetadataCache.STATUS, path,
+                                   lambda: client.status(path, strict=False))
         return status
 
+    def _list_path(self, path, nameservice):
+        """
+            cached client.list(path, status=True), for lookups inside
+            a command such as glob expansion and copies
+        """
+        client = self.session_manager(nameservice)
+        cache = self.session_manager.metadata_cache
+        return cache.get_or_load(nameservice, MetadataCache.LISTING, path,
+                                 lambda: client.list(path, status=True))
+
+    def _iter_list_path(self, path, nameservice):
+        """
+            stream a directory listing page by page, always from the
+            namenode since the listing is shown to the user, a listing
+            which fits in one page is cached for later lookups
+            @return generator of [(path suffix, FileStatus), ...]
+        """
+        cache = self.session_manager.metadata_cache
+        client = self.session_manager(nameservice)
+        # only the first page is kept, a listing which fits in it is cached
+        first_page = None
+        page_count = 0
+        for batch in client.list_batches(path):
+            if not page_count:
+                first_page = batch
+            page_count += 1
+            yield batch
+
+        if page_count == 1:
+            cache.put(nameservice, MetadataCache.LISTING, path, first_page)
+
+    def _get_content_summaries(self, paths, nameservice):
+        """
+            GETCONTENTSUMMARY of many paths on a pool of
+            min(len(paths), summary_threads) workers, more paths than
+            workers take ceil(len(paths) / summary_threads) rounds
+            @return list of (path, ContentSummary, exception) in input order
+        """
+        client = self.session_manager(nameservice)
+        return tools.map_in_pool(client.content, paths, config.summary_threads())
+
+    def _invalidate_path(self, path, nameservice, recursively=False):
+        """
+            drop cached metadata of a path which is about to change
+        """
+        self.session_manager.invalidate(nameservice, path, recursive=recursively)
+
+    def _expand_paths(self, paths, command):
+        """
+            replace glob patterns by the paths they match
+            @params paths list of HdfsPath
+            @params command name used in the error message
+            @return list of HdfsPath
+        """
+        expanded = []
+        for path in paths:
+            if not isinstance(path, HdfsPath) or not has_glob(path['path']):
+                expanded.append(path)
+                continue
+
+            nameservice = path['nameservice']
+            globber = HdfsGlobber(lambda dir_path: self._list_path(dir_path, nameservice),
+                                  lambda hdfs_path: self._get_path_detail(hdfs_path, nameservice),
+                                  threads=config.walker_threads())
+            matches = globber.glob(path['path'])
+            if not matches:
+                raise CommandExecuteException("%s: `%s`: No such file or directory" \
+                                              % (command, path['source_path']))
+
+            expanded.extend(HdfsPath(path['path_service'] + match) for match in matches)
+
+        return expanded
+
     def _get_list_detail_by_hdfs_path(self, path, fields=None):
         """
             @params path hdfs_path
             @params fields FileStatus fields
             @return detail list
         """
-        client = self.session_manager(path['nameservice'])
-        result = client.list(path['path'], status=True)
+        result = self._list_path(path['path'], path['nameservice'])
         return self._get_result_detail(result, fields=fields)
 
     def _get_result_detail(self, result, fields=None, show_path_only=False,
@@ -101,9 +265,6 @@ class CommandBase(object):
         if sort_by_size:
             fields.append("length")
 
-        if recursively:
-            pass
-
         data = []
         for item in result:
             _, detail = item
@@ -174,13 +335,149 @@ class CommandBase(object):
 
         return True
 
-    def _copy_hdfs_file(self, src, dest, overwrite=False):
-        chunk_size = 1024 * 1024 * 4
+    def parallel_copy_hdfs_path(self, src, dest, overwrite=False, threads=1):
+        """
+            list the whole source tree first, then copy files on a thread pool
+            @params src HdfsPath
+            @params dest HdfsPath
+            @params threads pool size
+            @return (file count, failure list)
+        """
+        if not isinstance(src, HdfsPath) or \
+                not isinstance(dest, HdfsPath):
+            raise CommandExecuteException("get wrong type of hdfs path")
 
+        src_detail = self._get_path_detail(src['path'], src['nameservice'])
+        if not src_detail:
+            raise CommandExecuteException("-cp: `%s` No such file or directory" % src['path'])
+
+        if src_detail['type'] == HDFS_DIRECTORY_TYPE:
+            tasks = self._plan_copy_directory(src, dest)
+        elif src_detail['type'] == HDFS_FILE_TYPE:
+            tasks = [(src['path'], self._resolve_copy_save_path(src, dest))]
+        else:
+            tasks = []
+
+        threads = min(threads, config.max_transfer_threads())
+
+        def copy_task(task):
+            src_path, save_path = task
+            self.check_cancelled()
+            self._transfer_hdfs_file(src['nameservice'], src_path,
+                                     dest['nameservice'], save_path,
+                                     overwrite=overwrite)
+            self.add_progress(files=1)
+
+        try:
+            results = tools.map_in_pool(copy_task, tasks, threads)
+        finally:
+            self._invalidate_path(dest['path'], dest['nameservice'], recursively=True)
+
+        failures = []
+        for task, _, error in results:
+            if error is not None:
+                src_path, save_path = task
+                failures.append(OrderedDict([
+                    ("src", src_path),
+                    ("dest", save_path),
+                    ("error", str(error))
+                ]))
+
+        return len(tasks), failures
+
+    def _plan_copy_directory(self, src, dest):
+        """
+            walk source directory, create destination directories
+            @return list of (src file path, dest file path)
+        """
+        dest_client = self.session_manager(dest['nameservice'])
+
+        tasks = []
+        dest_client.makedirs(dest['path'])
+        self._invalidate_path(dest['path'], dest['nameservice'], recursively=True)
+        for relative_path, detail in self._list_hdfs_tree(src['nameservice'], src['path']):
+            src_path_next = os.path.join(src['path'], relative_path)
+            dest_path_next = os.path.join(dest['path'], relative_path)
+            if detail['type'] == HDFS_DIRECTORY_TYPE:
+                dest_client.makedirs(dest_path_next)
+            elif detail['type'] == HDFS_FILE_TYPE:
+                tasks.append((src_path_next, dest_path_next))
+
+        return tasks
+
+    def _list_hdfs_tree(self, nameservice, path):
+        """
+            breadth first walk of a directory
+            @return list of (path relative to `path`, FileStatus),
+                    parents always come before their children
+        """
+        entries = []
+        pending = [""]
+        while pending:
+            relative_dir = pending.pop(0)
+            for path_suffix, detail in self._list_path(os.path.join(path, relative_dir), nameservice):
+                relative_path = os.path.join(relative_dir, path_suffix)
+                entries.append((relative_path, detail))
+                if detail['type'] == HDFS_DIRECTORY_TYPE:
+                    pending.append(relative_path)
+
+        return entries
+
+    def _run_transfers(self, transfer, tasks, threads):
+        """
+            run file transfers on a thread pool
+            @params transfer callable(src, dest)
+            @params tasks list of (src, dest, length)
+            @return DataFrame, one summary row per file
+        """
+        def timed_transfer(task):
+            src, dest, _ = task
+            self.check_cancelled()
+            start = time.time()
+            transfer(src, dest)
+            self.add_progress(files=1)
+            return time.time() - start
+
+        threads = min(threads, config.max_transfer_threads())
+        self.start_progress(sum(length for _, _, length in tasks), len(tasks))
+
+        data = []
+        for task, elapsed, error in tools.map_in_pool(timed_transfer, tasks, threads):
+            src, dest, length = task
+            d = OrderedDict()
+            d['src'] = src
+            d['dest'] = dest
+            d['length'] = length
+            if error is None:
+                d['elapsed'] = "%.2fs" % elapsed
+                d['throughput'] = "%s/s" % tools.convert_size_readable(length / max(elapsed, 0.001))
+                d['status'] = "OK"
+            else:
+                d['elapsed'] = None
+                d['throughput'] = None
+                d['status'] = str(error)
+            data.append(d)
+
+        return self._trans_to_dataframe(data)
+
+    def _copy_hdfs_file(self, src, dest, overwrite=False):
         src_detail = self._get_path_detail(src['path'], src['nameservice'])
         if src_detail['type'] != HDFS_FILE_TYPE:
             raise CommandExecuteException("-cp: Only support copy file")
 
+        save_path = self._resolve_copy_save_path(src, dest)
+        self._transfer_hdfs_file(src['nameservice'], src['path'],
+                                 dest['nameservice'], save_path,
+                                 overwrite=overwrite)
+        self.add_progress(files=1)
+        return True
+
+    def _resolve_copy_save_path(self, src, dest):
+        """
+            dest may be an existing directory, an existing file
+            or a new file path
+            @return file path to write
+        """
         filename = os.path.basename(src['path'])
 
         dest_detail = self._get_path_detail(dest['path'], dest['nameservice'])
@@ -205,18 +502,115 @@ class CommandBase(object):
                 raise CommandExecuteException("-cp: dest path `%s` is %s file type" \
                                               % (dest['source_path'], dest_detail['type']))
 
+        return save_path
 
-        src_client = self.session_manager(src['nameservice'])
-        dest_client = self.session_manager(dest['nameservice'])
-        with src_client.read(src['path'], chunk_size=chunk_size) as reader_generator:
-            dest_client.write(
-                save_path,
-                data=reader_generator,
-                overwrite=overwrite
-            )
+    def _transfer_hdfs_file(self, src_nameservice, src_path, dest_nameservice,
+                            save_path, overwrite=False):
+        """
+            stream one file, source reads run ahead of destination writes
+            on a separate thread so both DataNodes stay busy
+        """
+        chunk_size = config.copy_chunk_size()
+
+        src_client = self.session_manager(src_nameservice)
+        dest_client = self.session_manager(dest_nameservice)
+        pipeline = ChunkPipeline(
+            lambda: src_client.read(src_path, chunk_size=chunk_size),
+            queue_depth=config.copy_queue_depth()
+        )
+        try:
+            with pipeline as reader_generator:
+                dest_client.write(
+                    save_path,
+                    data=self._track_chunks(reader_generator),
+                    overwrite=overwrite
+                )
+        except CommandCancelledException:
+            # the write started, the file is ours and incomplete
+            dest_client.delete(save_path)
+            raise
+        finally:
+            self._invalidate_path(save_path, dest_nameservice)
 
         return True
 
+    def _change_tree(self, paths, change, recursively=False):
+        """
+            call change(client, hdfs path) on every path, with recursively on
+            every entry below them too, from a pool of metadata_threads which
+            sends at most metadata_ops_per_second calls to the namenode
+            @return CommandResult with changed and failed counts
+        """
+        limiter = tools.RateLimiter(config.metadata_ops_per_second())
+        threads = config.metadata_threads()
+        changed = []
+        failures = []
+        pending = {}
+
+        def apply(item):
+            nameservice, hdfs_path = item
+            limiter.acquire()
+            change(self.session_manager(nameservice), hdfs_path)
+
+        def collect(return_when):
+            done, _ = wait(list(pending), return_when=return_when)
+            for future in done:
+                hdfs_path = pending.pop(future)
+                if future.exception() is None:
+                    changed.append(hdfs_path)
+                    self.add_progress(files=1)
+                else:
+                    failures.append((hdfs_path, future.exception()))
+
+        executor = ThreadPoolExecutor(max_workers=threads)
+        try:
+            for item in self._iter_tree_paths(paths, recursively, failures):
+                self.check_cancelled()
+                # keep the queue short, the walk may yield millions of entries
+                if len(pending) >= threads * 4:
+                    collect(FIRST_COMPLETED)
+                pending[executor.submit(apply, item)] = item[1]
+            if pending:
+                collect(ALL_COMPLETED)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for path in paths:
+                self._invalidate_path(path['path'], path['nameservice'], recursively=recursively)
+
+        if failures:
+            message = "%s: %s entries changed, %s failed\n" % (self.command, len(changed), len(failures))
+            for hdfs_path, error in failures[:config.max_reported_failures()]:
+                message += "%s: `%s`: %s\n" % (self.command, hdfs_path, error)
+            return CommandResult(status=False, message=message)
+
+        return CommandResult(data="Success: %s entries changed" % len(changed))
+
+    def _iter_tree_paths(self, paths, recursively, failures):
+        """
+            @return generator of (nameservice, hdfs path), directories
+                    are listed lazily by a concurrent walker
+        """
+        for path in paths:
+            nameservice = path['nameservice']
+            status = self._get_path_detail(path['path'], nameservice, fresh=True)
+            if not status:
+                failures.append((path['source_path'], "No such file or directory"))
+                continue
+
+            yield nameservice, path['path']
+            if not recursively or status['type'] != HDFS_DIRECTORY_TYPE:
+                continue
+
+            def list_dir(dir_path, nameservice=nameservice):
+                return list(itertools.chain.from_iterable(self._iter_list_path(dir_path, nameservice)))
+
+            walker = HdfsTreeWalker(list_dir, threads=config.walker_threads())
+            for relative_path, _, _ in walker.walk(path['path']):
+                yield nameservice, os.path.join(path['path'], relative_path)
+            failures.extend(walker.errors)
+
     def delete_hdfs_path(self, path, recursively=False, **kwargs):
         """
             delete hdfs path
@@ -228,6 +622,7 @@ class CommandBase(object):
         hdfs_path = path.get("path")
         client = self.session_manager(path['nameservice'])
         is_success = client.delete(hdfs_path, recursive=recursively)
+        self._invalidate_path(hdfs_path, path['nameservice'], recursively=True)
         return is_success
 
     def move_to_trash(self, path):
@@ -246,9 +641,11 @@ class CommandBase(object):
         _trash_path_status = self._get_path_detail(_trash_path, path['nameservice'])
         if not _trash_path_status:
             # file not exists
-            client.makedirs(_trash_path)
+            self._make_dir(_trash_path, path['nameservice'])
 
         client.rename(hdfs_path, os.path.join(_trash_path, filename))
+        self._invalidate_path(hdfs_path, path['nameservice'], recursively=True)
+        self._invalidate_path(os.path.join(_trash_path, filename), path['nameservice'], recursively=True)
         return True
 
 
@@ -259,22 +656,101 @@ class ListCommand(CommandBase):
         @return DataFrame
     """
 
+    command = "-ls"
+
     def execute(self, hdfs_paths, **kwargs):
-        df = DataFrame()
-        for path in hdfs_paths:
+        df = tools.import_pandas().DataFrame()
+        message = ""
+        for path in self._expand_paths(hdfs_paths, self.command):
             if not isinstance(path, HdfsPath):
                 continue
 
             real_path = path.get("path")
             source_path = path.get("source_path")
 
-            client = self.session_manager(path['nameservice'])
-            response = client.list(real_path, status=True)
+            errors = []
+            if kwargs.get("recursively"):
+                batches, errors = self._walk_entries(real_path, path['nameservice'], source_path, **kwargs)
+            else:
+                batches = self._iter_list_path(real_path, path['nameservice'])
+            response = self._take_entries(batches, **kwargs)
+            # filled while the walk is consumed
+            for error_path, error in errors:
+                message += "-ls: `%s`: %s\n" % (error_path, error)
 
             df_tmp = self.pack_format(response, source_path, **kwargs)
             df = df.append(df_tmp)
 
-        return CommandResult(data=df)
+        return CommandResult(data=df, message=message or None)
+
+    def _walk_entries(self, path, nameservice, source_path, limit=None, max_depth=None, **kwargs):
+        """
+            list a tree with a concurrent walker, render the rows
+            collected so far every partial_result_interval seconds,
+            with a limit and -t/-S the whole tree is streamed to the
+            bounded heap of _take_entries instead
+            @return ([[(relative path, FileStatus), ...]], [(path, error), ...]),
+                    errors are complete once the entries are consumed
+        """
+        def list_dir(dir_path):
+            return list(itertools.chain.from_iterable(self._iter_list_path(dir_path, nameservice)))
+
+        # the top entries can be anywhere in the tree
+        top_entries = limit and (kwargs.get("sort_by_time") or kwargs.get("sort_by_size"))
+        walker = HdfsTreeWalker(list_dir, threads=config.walker_threads(),
+                                max_depth=max_depth, max_entries=None if top_entries else limit)
+
+        if top_entries:
+            return [self._iter_walk(walker, path)], walker.errors
+
+        self._last_emit = time.time()
+        entries = []
+        # rows are labelled by pathSuffix, _iter_walk makes it relative to the root
+        for entry in self._iter_walk(walker, path):
+            entries.append(entry)
+            self._emit_partial(entries, source_path, **kwargs)
+
+        # listings complete in any order, present the tree like hadoop does
+        entries.sort(key=lambda item: item[0])
+        return [entries], walker.errors
+
+    def _iter_walk(self, walker, path):
+        for relative_path, status, _ in walker.walk(path):
+            self.check_cancelled()
+            status['pathSuffix'] = relative_path
+            yield relative_path, status
+
+    def _emit_partial(self, entries, source_path, **kwargs):
+        """
+            render the rows collected so far every partial_result_interval seconds
+        """
+        if time.time() - self._last_emit < config.partial_result_interval():
+            return
+
+        self._last_emit = time.time()
+        head = [(p, dict(s)) for p, s in entries[:config.partial_result_rows()]]
+        self.emit("partial", {
+            "data": self.pack_format(head, source_path, **kwargs),
+            "count": len(entries)
+        })
+
+    def _take_entries(self, batches, limit=None, sort_by_time=False,
+                      sort_by_size=False, reverse_sort=False, **kwargs):
+        """
+            consume listing pages, with a limit stop as soon as enough
+            entries are read, or keep only the top entries when sorting
+            @return list of (path suffix, FileStatus)
+        """
+        entries = itertools.chain.from_iterable(batches)
+        if not limit:
+            return list(entries)
+
+        if sort_by_time or sort_by_size:
+            field = "length" if sort_by_size else "modificationTime"
+            select = heapq.nlargest if reverse_sort else heapq.nsmallest
+            return select(limit, entries, key=lambda item: item[1][field])
+
+        return list(itertools.islice(entries, limit))
 
     def pack_format(self, result, source_path, **kwargs):
         fields = ["type", "permission", "replication", "owner",
@@ -301,42 +777,202 @@ class DuCommand(ListCommand):
         hdfs dfs -du path
     """
 
-    def pack_format(self, result, source_path, **kwargs):
-        fields = ["length", "replication", "pathSuffix"]
-        detail_list = self._get_result_detail(result, fields=fields, **kwargs)
+    command = "-du"
+
+    def execute(self, hdfs_paths, **kwargs):
+        df = tools.import_pandas().DataFrame()
+        message = ""
+        for path in self._expand_paths(hdfs_paths, self.command):
+            if not isinstance(path, HdfsPath):
+                continue
+
+            real_path = path.get("path")
+            source_path = path.get("source_path")
+
+            if kwargs.get("summary"):
+                # the path itself, not its children
+                status = self._get_path_detail(real_path, path['nameservice'], fresh=True)
+                if not status:
+                    raise CommandExecuteException("-du: `%s` No such file or directory" % source_path)
+                status = dict(status, pathSuffix="")
+                response = [("", status)]
+            else:
+                batches = self._iter_list_path(real_path, path['nameservice'])
+                response = list(itertools.chain.from_iterable(batches))
+
+            summaries = self._get_directory_summaries(real_path, path['nameservice'], response)
+            for hdfs_path, _, error in summaries.values():
+                if error is not None:
+                    message += "-du: `%s`: %s\n" % (hdfs_path, error)
+
+            df_tmp = self.pack_format(response, source_path, summaries=summaries, **kwargs)
+            df = df.append(df_tmp)
+
+        return CommandResult(data=df, message=message or None)
 
+    def _get_directory_summaries(self, path, nameservice, result):
+        """
+            fetch content summaries of directory entries concurrently,
+            a directory size is not part of its FileStatus
+            @return {path suffix: (hdfs path, ContentSummary, exception)}
+        """
+        directories = [(path_suffix, self._get_full_path(path, path_suffix))
+                       for path_suffix, detail in result
+                       if detail['type'] == HDFS_DIRECTORY_TYPE]
+
+        summaries = self._get_content_summaries([hdfs_path for _, hdfs_path in directories], nameservice)
+        return dict((path_suffix, summary)
+                    for (path_suffix, _), summary in zip(directories, summaries))
+
+    def pack_format(self, result, source_path, summaries=None, **kwargs):
+        summaries = summaries or {}
         humanized = kwargs.get("humanized", False)
-        summary = kwargs.get("summary", False)
-        if summary:
-            return self._summary_format(detail_list, source_path, humanized)
 
         data = []
-        for detail in detail_list:
-            path_suffix = detail.pop("pathSuffix")
-            detail['path'] = self._get_full_path(source_path, path_suffix)
+        for path_suffix, detail in result:
+            d = OrderedDict()
+            if path_suffix in summaries:
+                _, summary, _ = summaries[path_suffix]
+                d['length'] = summary['length'] if summary else None
+                d['replicationLength'] = summary['spaceConsumed'] if summary else None
+            else:
+                d['length'] = detail['length']
+                d['replicationLength'] = detail['length'] * detail['replication']
 
-            if humanized:
-                detail['replicationLength'] = tools.convert_size_readable(detail['length'] * detail['replication'])
-                detail['length'] = tools.convert_size_readable(detail['length'])
+            if humanized and d['length'] is not None:
+                d['length'] = tools.convert_size_readable(d['length'])
+                d['replicationLength'] = tools.convert_size_readable(d['replicationLength'])
 
-            data.append(detail)
+            d['path'] = self._get_full_path(source_path, path_suffix)
+            data.append(d)
 
         return self._trans_to_dataframe(data)
 
-    def _summary_format(self, detail_list, source_path, humanized):
-        length = sum([i['length'] for i in detail_list])
-        replication_length = sum([i['length'] * i['replication'] for i in detail_list])
 
-        if humanized:
-            length = tools.convert_size_readable(length)
-            replication_length = tools.convert_size_readable(replication_length)
+class FindCommand(ListCommand):
+    """
+        -find path [-name glob] [-size +1G] [-mtime -7] [-type f|d] ...
+        predicates are evaluated while a concurrent walker lists the tree
+    """
 
-        data = {
-            "length": length,
-            "replicationLength": replication_length,
-            "path": source_path
-        }
-        return self._trans_to_dataframe([data])
+    command = "-find"
+
+    size_units = {"": 1, "k": 1024, "m": 1024 ** 2, "g": 1024 ** 3, "t": 1024 ** 4}
+
+    def execute(self, hdfs_paths, limit=None, maxdepth=None, mindepth=None, prune=None, **kwargs):
+        predicates = self._build_predicates(**kwargs)
+        prune_regex = glob_to_regex(prune) if prune else None
+
+        def should_descend(relative_path, status, depth):
+            return not (prune_regex and prune_regex.match(os.path.basename(relative_path)))
+
+        def matches(relative_path, status, depth):
+            if mindepth and depth < mindepth:
+                return False
+            if prune_regex and prune_regex.match(os.path.basename(relative_path)):
+                return False
+            return all(predicate(relative_path, status) for predicate in predicates)
+
+        df = tools.import_pandas().DataFrame()
+        message = ""
+        for path in self._expand_paths(hdfs_paths, self.command):
+            nameservice = path['nameservice']
+            status = self._get_path_detail(path['path'], nameservice, fresh=True)
+            if not status:
+                raise CommandExecuteException("-find: `%s`: No such file or directory" % path['source_path'])
+
+            self._last_emit = time.time()
+            found = []
+            root = dict(status, pathSuffix="")
+            if matches(os.path.basename(path['path']), root, 0):
+                found.append(("", root))
+
+            if status['type'] == HDFS_DIRECTORY_TYPE and maxdepth != 0:
+                errors = self._find_in_tree(path, found, matches, should_descend,
+                                            limit=limit, maxdepth=maxdepth, **kwargs)
+                for error_path, error in errors:
+                    message += "-find: `%s`: %s\n" % (error_path, error)
+
+            found.sort(key=lambda item: item[0])
+            df = df.append(self.pack_format(found[:limit] if limit else found, path['source_path'], **kwargs))
+
+            if limit:
+                limit -= len(found)
+                if limit <= 0:
+                    break
+
+        return CommandResult(data=df, message=message or None)
+
+    def _find_in_tree(self, path, found, matches, should_descend, limit=None, maxdepth=None, **kwargs):
+        """
+            walk below path, append matches to found until limit is reached
+            @return [(path, error), ...] of directories which could not be listed
+        """
+        nameservice = path['nameservice']
+
+        def list_dir(dir_path):
+            return list(itertools.chain.from_iterable(self._iter_list_path(dir_path, nameservice)))
+
+        walker = HdfsTreeWalker(list_dir, threads=config.walker_threads(),
+                                max_depth=maxdepth, should_descend=should_descend)
+        entries = walker.walk(path['path'])
+        try:
+            for relative_path, status, depth in entries:
+                self.check_cancelled()
+                if not matches(relative_path, status, depth):
+                    continue
+
+                status['pathSuffix'] = relative_path
+                found.append((relative_path, status))
+                self._emit_partial(found, path['source_path'], **kwargs)
+                if limit and len(found) >= limit:
+                    break
+        finally:
+            # stops the walk and cancels pending listings
+            entries.close()
+
+        return walker.errors
+
+    def _build_predicates(self, name=None, iname=None, size=None, mtime=None,
+                          mmin=None, file_type=None, **kwargs):
+        """
+            @return list of callable(relative path, FileStatus) -> bool
+        """
+        predicates = []
+        if name:
+            name_regex = glob_to_regex(name)
+            predicates.append(lambda p, s: name_regex.match(os.path.basename(p)))
+        if iname:
+            iname_regex = re.compile(glob_to_regex(iname).pattern, re.IGNORECASE)
+            predicates.append(lambda p, s: iname_regex.match(os.path.basename(p)))
+        if file_type:
+            wanted = HDFS_FILE_TYPE if file_type == "f" else HDFS_DIRECTORY_TYPE
+            predicates.append(lambda p, s: s['type'] == wanted)
+
+        if size:
+            sign, number, unit = re.match(r"^([+-]?)(\d+)([kmgt]?)$", size.lower()).groups()
+            unit_bytes = self.size_units[unit]
+            if sign:
+                predicates.append(lambda p, s: self._compare(sign, s['length'], int(number) * unit_bytes))
+            else:
+                # like find, an exact size is compared in units rounded up
+                predicates.append(lambda p, s: -(-s['length'] // unit_bytes) == int(number))
+
+        now = time.time() * 1000
+        for value, period in ((mtime, 86400000), (mmin, 60000)):
+            if value:
+                sign, number = re.match(r"^([+-]?)(\d+)$", value).groups()
+                predicates.append(lambda p, s, sign=sign, number=int(number), period=period:
+                                  self._compare(sign, int((now - s['modificationTime']) // period), number))
+
+        return predicates
+
+    def _compare(self, sign, value, target):
+        if sign == "+":
+            return value > target
+        if sign == "-":
+            return value < target
+        return value == target
 
 
 class GetCommand(CommandBase):
@@ -345,21 +981,273 @@ class GetCommand(CommandBase):
         hdfs dfs -get path
     """
 
-    def execute(self, src, dest, **kwargs):
+    def execute(self, srcs, dest, **kwargs):
         # FIXME check file size restriction
 
-        user_workspace = config.user_workspace()
+        if isinstance(dest, HdfsPath):
+            dest = dest.get("path")
+
+        local_path = os.path.normpath(self._build_local_path(dest or "."))
+        is_local_dir = os.path.isdir(local_path)
+        srcs = self._expand_paths(srcs, "-get")
+        if len(srcs) > 1 and not is_local_dir:
+            raise CommandExecuteException("-get: `%s` is not a directory" % local_path)
+
+        tasks = []
+        for src in srcs:
+            status = self._get_path_detail(src['path'], src['nameservice'])
+            if not status:
+                raise CommandExecuteException("-get: `%s` No such file or directory" % src['source_path'])
 
+            save_path = local_path
+            if is_local_dir:
+                save_path = os.path.join(local_path, os.path.basename(src['path'].rstrip("/")))
+
+            if status['type'] == HDFS_DIRECTORY_TYPE:
+                tasks.extend(self._plan_download_directory(src, save_path))
+            else:
+                tasks.append((src['source_path'], save_path, status['length']))
+
+        lengths = dict((src_path, length) for src_path, _, length in tasks)
+
+        def download(src_path, save_path):
+            path = HdfsPath(src_path)
+            client = self.session_manager(path['nameservice'])
+            self._download_hdfs_file(client, path['path'], save_path, lengths[src_path])
+
+        threads = kwargs.get("threads") or config.transfer_threads()
+        return CommandResult(data=self._run_transfers(download, tasks, threads))
+
+    def _plan_download_directory(self, src, local_path):
+        """
+            create local directories for a hdfs directory
+            @return list of (source path, local path, length)
+        """
+        os.makedirs(local_path, exist_ok=True)
+
+        tasks = []
+        for relative_path, detail in self._list_hdfs_tree(src['nameservice'], src['path']):
+            save_path = os.path.join(local_path, relative_path)
+            if detail['type'] == HDFS_DIRECTORY_TYPE:
+                os.makedirs(save_path, exist_ok=True)
+            elif detail['type'] == HDFS_FILE_TYPE:
+                src_path = "{path_service}{path}".format(
+                    path_service=src['path_service'],
+                    path=os.path.join(src['path'], relative_path)
+                )
+                tasks.append((src_path, save_path, detail['length']))
+
+        return tasks
+
+    def _download_hdfs_file(self, client, hdfs_path, local_path, length):
+        if length >= config.parallel_download_threshold():
+            return self._download_by_ranges(client, hdfs_path, local_path, length)
+
+        if os.path.isdir(local_path):
+            local_path = os.path.join(local_path, os.path.basename(hdfs_path))
+
+        temp_path = self._local_temp_path(local_path)
+        try:
+            with client.read(hdfs_path, chunk_size=config.copy_chunk_size()) as reader:
+                with open(temp_path, "wb") as writer:
+                    for chunk in self._track_chunks(reader):
+                        writer.write(chunk)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        os.replace(temp_path, local_path)
+        return local_path
+
+    def _download_by_ranges(self, client, hdfs_path, local_path, length):
+        """
+            fetch byte ranges of one large file concurrently,
+            each range is written in place into a preallocated local file
+            @return local save path
+        """
+        if os.path.isdir(local_path):
+            local_path = os.path.join(local_path, os.path.basename(hdfs_path))
+
+        range_size = config.download_range_size()
+        ranges = [(offset, min(range_size, length - offset))
+                  for offset in range(0, length, range_size)]
+
+        temp_path = self._local_temp_path(local_path)
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, length)
+
+            def download_range(item):
+                offset, size = item
+                return self._download_range_with_retry(client, hdfs_path, fd, offset, size)
+
+            results = tools.map_in_pool(download_range, ranges, config.download_threads())
+        finally:
+            os.close(fd)
+
+        failures = [(item, error) for item, _, error in results if error is not None]
+        if failures:
+            os.remove(temp_path)
+            self.check_cancelled()
+            (offset, size), error = failures[0]
+            raise CommandExecuteException("-get: %s of %s ranges failed, bytes %s-%s: %s"
+                                          % (len(failures), len(ranges), offset, offset + size, error))
+
+        os.replace(temp_path, local_path)
+        return local_path
+
+    def _download_range_with_retry(self, client, hdfs_path, fd, offset, size):
+        """
+            retry only the failed range, sleep by retry_seconds_to_sleep_list
+        """
+        sleep_list = config.retry_seconds_to_sleep_list()
+        attempt = {"bytes": 0}
+        for retry_seconds in list(sleep_list) + [None]:
+            try:
+                return self._download_range(client, hdfs_path, fd, offset, size, attempt)
+            except CommandCancelledException:
+                raise
+            except Exception:
+                self._undo_attempt(attempt)
+                if retry_seconds is None:
+                    raise
+                time.sleep(retry_seconds)
+
+    def _download_range(self, client, hdfs_path, fd, offset, size, attempt=None):
+        position = offset
+        chunk_size = config.copy_chunk_size()
+        with client.read(hdfs_path, offset=offset, length=size, chunk_size=chunk_size) as reader:
+            for chunk in self._track_chunks(reader, attempt):
+                os.pwrite(fd, chunk, position)
+                position += len(chunk)
+
+        if position - offset != size:
+            raise CommandExecuteException("-get: short read at offset %s, expected %s bytes got %s"
+                                          % (offset, size, position - offset))
+        return size
+
+
+class GetMergeCommand(CommandBase):
+    """
+        -getmerge [-nl] [-t threads] src ... localdst
+        fetch part files concurrently, append them to the local file in order
+    """
+
+    command = "-getmerge"
+
+    def execute(self, srcs, dest, add_newline=False, threads=None, **kwargs):
         if isinstance(dest, HdfsPath):
             dest = dest.get("path")
 
-        local_path = self._build_local_path(dest)
+        local_path = os.path.normpath(self._build_local_path(dest))
+        if os.path.isdir(local_path):
+            raise CommandExecuteException("-getmerge: `%s`: Is a directory" % local_path)
+
+        parts = self._list_parts(self._expand_paths(srcs, self.command))
+        threads = min(threads or config.transfer_threads(), config.max_transfer_threads())
+        self.start_progress(sum(part[2] for part in parts), len(parts))
+
+        start = time.time()
+        temp_path = self._local_temp_path(local_path)
+        try:
+            with open(temp_path, "wb") as output:
+                self._merge_parts(parts, output, threads, add_newline=add_newline)
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        os.replace(temp_path, local_path)
+
+        length = sum(part[2] for part in parts)
+        return CommandResult(data="Success: %s files, %s merged into %s in %.2fs" % (
+            len(parts), tools.convert_size_readable(length), local_path, time.time() - start))
+
+    def _list_parts(self, srcs):
+        """
+            files of each source directory sorted by name,
+            _SUCCESS and dot files are skipped
+            @return list of (nameservice, hdfs path, length)
+        """
+        parts = []
+        for src in srcs:
+            status = self._get_path_detail(src['path'], src['nameservice'])
+            if not status:
+                raise CommandExecuteException("-getmerge: `%s`: No such file or directory" % src['source_path'])
+
+            if status['type'] == HDFS_FILE_TYPE:
+                parts.append((src['nameservice'], src['path'], status['length']))
+                continue
+
+            for path_suffix, detail in sorted(self._list_path(src['path'], src['nameservice'])):
+                if detail['type'] == HDFS_FILE_TYPE and not path_suffix.startswith(("_", ".")):
+                    parts.append((src['nameservice'],
+                                  self._get_full_path(src['path'], path_suffix),
+                                  detail['length']))
+        return parts
+
+    def _merge_parts(self, parts, output, threads, add_newline=False):
+        """
+            at most threads + 1 parts are buffered: the one being written
+            and the ones being fetched ahead of it
+        """
+        executor = ThreadPoolExecutor(max_workers=threads)
+        remaining = iter(parts)
+        pending = deque(executor.submit(self._fetch_part, part)
+                        for part in itertools.islice(remaining, threads))
+        try:
+            while pending:
+                self.check_cancelled()
+                buffer = pending.popleft().result()
+                part = next(remaining, None)
+                if part is not None:
+                    pending.append(executor.submit(self._fetch_part, part))
+
+                with buffer:
+                    buffer.seek(0)
+                    shutil.copyfileobj(buffer, output, config.copy_chunk_size())
+                if add_newline:
+                    output.write(b"\n")
+                self.add_progress(files=1)
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            for future in pending:
+                if not future.cancelled() and future.exception() is None:
+                    future.result().close()
+
+    def _fetch_part(self, part):
+        """
+            @return spooled temp file holding the part
+        """
+        nameservice, hdfs_path, length = part
+        client = self.session_manager(nameservice)
+        buffer = tempfile.SpooledTemporaryFile(max_size=config.getmerge_spool_size())
+        sleep_list = config.retry_seconds_to_sleep_list()
+        attempt = {"bytes": 0}
+        for retry_seconds in list(sleep_list) + [None]:
+            try:
+                buffer.seek(0)
+                buffer.truncate()
+                with client.read(hdfs_path, chunk_size=config.copy_chunk_size()) as reader:
+                    for chunk in self._track_chunks(reader, attempt):
+                        buffer.write(chunk)
+
+                if buffer.tell() != length:
+                    raise CommandExecuteException("-getmerge: short read of %s, expected %s bytes got %s"
+                                                  % (hdfs_path, length, buffer.tell()))
+                return buffer
+            except CommandCancelledException:
+                buffer.close()
+                raise
+            except Exception:
+                self._undo_attempt(attempt)
+                if retry_seconds is None:
+                    buffer.close()
+                    raise
+                time.sleep(retry_seconds)
 
-        hdfs_path = src.get("path")
-        client = self.session_manager(src['nameservice'])
-        save_path = client.download(hdfs_path, local_path, overwrite=True, chunk_size=1024 * 1024 * 4)
-        result = "Save Path: %s" % save_path
-        return CommandResult(data=result)
 
 
 class PutCommand(CommandBase):
@@ -367,18 +1255,138 @@ class PutCommand(CommandBase):
         Upload File
         upload local path to hdfs
     """
-    def execute(self, src, dest, **kwargs):
-        if isinstance(src, HdfsPath):
-            src = src.get("path")
+    def execute(self, srcs, dest, **kwargs):
+        client = self.session_manager(dest['nameservice'])
+        dest_status = self._get_path_detail(dest['path'], dest['nameservice'])
+        is_remote_dir = bool(dest_status) and dest_status['type'] == HDFS_DIRECTORY_TYPE
+        if dest['path'].endswith("/"):
+            # "/up/" names a directory even before it exists
+            if dest_status and not is_remote_dir:
+                raise CommandExecuteException("-put: `%s` is not a directory" % dest['source_path'])
+            is_remote_dir = True
+        if len(srcs) > 1 and not is_remote_dir:
+            raise CommandExecuteException("-put: `%s` is not a directory" % dest['source_path'])
+
+        tasks = []
+        for src in srcs:
+            if isinstance(src, HdfsPath):
+                src = src.get("path")
+
+            local_path = os.path.normpath(self._build_local_path(src))
+            if not os.path.exists(local_path):
+                raise CommandExecuteException("-put: `%s` No such file or directory" % local_path)
+
+            hdfs_path = dest['path']
+            if is_remote_dir:
+                hdfs_path = os.path.join(hdfs_path, os.path.basename(local_path.rstrip("/")))
+
+            if os.path.isdir(local_path):
+                tasks.extend(self._plan_upload_directory(client, local_path, hdfs_path))
+            else:
+                tasks.append((local_path, hdfs_path, os.path.getsize(local_path)))
 
-        local_path = self._build_local_path(src)
+        def upload(local_path, hdfs_path):
+            self._upload_local_file(client, local_path, hdfs_path)
 
-        hdfs_path = dest.get("path")
-        client = self.session_manager(dest['nameservice'])
-        remote_path = client.upload(hdfs_path, local_path, overwrite=False)
+        threads = kwargs.get("threads") or config.transfer_threads()
+        try:
+            df = self._run_transfers(upload, tasks, threads)
+        finally:
+            self._invalidate_path(dest['path'], dest['nameservice'], recursively=True)
+        return CommandResult(data=df)
 
-        result = "Upload Path: %s" % remote_path
-        return CommandResult(data=result)
+    def _plan_upload_directory(self, client, local_path, hdfs_path):
+        """
+            create remote directories for a local directory
+            @return list of (local path, hdfs path, length)
+        """
+        tasks = []
+        for dirpath, dirnames, filenames in os.walk(local_path):
+            relative_dir = os.path.relpath(dirpath, local_path)
+            remote_dir = os.path.normpath(os.path.join(hdfs_path, relative_dir))
+            client.makedirs(remote_dir)
+            for filename in sorted(filenames):
+                file_path = os.path.join(dirpath, filename)
+                tasks.append((file_path, os.path.join(remote_dir, filename), os.path.getsize(file_path)))
+
+        return tasks
+
+    def _upload_local_file(self, client, local_path, hdfs_path):
+        length = os.path.getsize(local_path)
+        if length >= config.parallel_upload_threshold():
+            return self._upload_by_parts(client, hdfs_path, local_path)
+
+        try:
+            client.write(hdfs_path, data=self._read_local_segment(local_path, 0, length), overwrite=False)
+        except CommandCancelledException:
+            # the write started, the file is ours and incomplete
+            client.delete(hdfs_path)
+            raise
+        return hdfs_path
+
+    def _upload_by_parts(self, client, hdfs_path, local_path):
+        """
+            upload fixed size segments to temporary part files concurrently,
+            CONCAT them into the first part and rename it into place
+            @return remote path
+        """
+        status = client.status(hdfs_path, strict=False)
+        if status and status['type'] == HDFS_DIRECTORY_TYPE or hdfs_path.endswith("/"):
+            hdfs_path = os.path.join(hdfs_path, os.path.basename(local_path))
+        elif status:
+            raise CommandExecuteException("-put: `%s` File exists" % hdfs_path)
+
+        hdfs_path = os.path.normpath(hdfs_path)
+        if not os.path.basename(hdfs_path):
+            raise CommandExecuteException("-put: `%s` is not a valid file name" % hdfs_path)
+
+        length = os.path.getsize(local_path)
+        part_size = config.upload_part_size()
+
+        # parts live next to the target, CONCAT needs them in one directory
+        temp_path = os.path.join(os.path.dirname(hdfs_path),
+                                 "._COPYING_.%s" % os.path.basename(hdfs_path))
+        parts = []
+        for index, offset in enumerate(range(0, length, part_size)):
+            part_path = temp_path if index == 0 else "%s.part-%05d" % (temp_path, index)
+            parts.append((part_path, offset, min(part_size, length - offset)))
+
+        def upload_part(part):
+            part_path, offset, size = part
+            client.write(part_path, data=self._read_local_segment(local_path, offset, size),
+                         overwrite=True)
+
+        try:
+            failures = [(part, error) for part, _, error
+                        in tools.map_in_pool(upload_part, parts, config.upload_threads())
+                        if error is not None]
+            if failures:
+                (part_path, offset, size), error = failures[0]
+                raise CommandExecuteException("-put: %s of %s parts failed, bytes %s-%s: %s"
+                                              % (len(failures), len(parts), offset, offset + size, error))
+
+            if len(parts) > 1:
+                client.concat(temp_path, [part_path for part_path, _, _ in parts[1:]])
+            client.rename(temp_path, hdfs_path)
+        except Exception:
+            for part_path, _, _ in parts:
+                client.delete(part_path)
+            raise
+
+        return hdfs_path
+
+    def _read_local_segment(self, local_path, offset, size):
+        chunk_size = config.copy_chunk_size()
+        with open(local_path, "rb") as reader:
+            reader.seek(offset)
+            while size > 0:
+                self.check_cancelled()
+                chunk = reader.read(min(chunk_size, size))
+                if not chunk:
+                    break
+                size -= len(chunk)
+                self.add_progress(nbytes=len(chunk))
+                yield chunk
 
 
 class MkdirCommand(CommandBase):
@@ -391,15 +1399,13 @@ class MkdirCommand(CommandBase):
         for path in paths:
             hdfs_path = path.get("path")
             source_path = path.get("source_path")
-            client = self.session_manager(path['nameservice'])
-
-            status_info = client.status(hdfs_path, strict=False)
+            status_info = self._get_path_detail(hdfs_path, path['nameservice'])
             if status_info:
                 # path already exists, skip
                 message += "mkdir: `%s` File exists </br>" % source_path
                 continue
 
-            client.makedirs(hdfs_path)
+            self._make_dir(hdfs_path, path['nameservice'])
 
         message = message or "Success"
         return CommandResult(data=message)
@@ -412,8 +1418,57 @@ class CopyCommand(CommandBase):
 
     def execute(self, src, dest, **kwargs):
         overwrite = kwargs.get("force")
-        self.copy_hdfs_path(src, dest, overwrite=overwrite)
-        return CommandResult(data="Success")
+        threads = kwargs.get("threads") or config.default_copy_threads()
+        pairs = self._plan_sources(src, dest)
+        self._start_copy_progress([src_path for src_path, _ in pairs])
+        if threads <= 1:
+            for src_path, dest_path in pairs:
+                self.copy_hdfs_path(src_path, dest_path, overwrite=overwrite)
+            return CommandResult(data="Success")
+
+        total = 0
+        failures = []
+        for src_path, dest_path in pairs:
+            count, errors = self.parallel_copy_hdfs_path(src_path, dest_path, overwrite=overwrite,
+                                                         threads=threads)
+            total += count
+            failures.extend(errors)
+
+        if failures:
+            message = "-cp: %s of %s files failed\n" % (len(failures), total)
+            for failure in failures:
+                message += "%(src)s -> %(dest)s: %(error)s\n" % failure
+            return CommandResult(status=False, message=message)
+
+        return CommandResult(data="Success: %s files copied" % total)
+
+    def _start_copy_progress(self, srcs):
+        """
+            totals from content summaries, one call per source
+        """
+        summaries = self._get_content_summaries([src['path'] for src in srcs], srcs[0]['nameservice'])
+        if any(error is not None for _, _, error in summaries):
+            return self.start_progress()
+
+        self.start_progress(sum(summary['length'] for _, summary, _ in summaries),
+                            sum(summary['fileCount'] for _, summary, _ in summaries))
+
+    def _plan_sources(self, src, dest):
+        """
+            a glob matching several paths copies each of them
+            into the destination directory
+            @return list of (src HdfsPath, dest HdfsPath)
+        """
+        srcs = self._expand_paths([src], "-cp")
+        if len(srcs) == 1:
+            return [(srcs[0], dest)]
+
+        dest_detail = self._get_path_detail(dest['path'], dest['nameservice'])
+        if not dest_detail or dest_detail['type'] != HDFS_DIRECTORY_TYPE:
+            raise CommandExecuteException("-cp: `%s`: Is not a directory" % dest['source_path'])
+
+        return [(path, HdfsPath(dest['path_service'] + os.path.join(dest['path'], os.path.basename(path['path']))))
+                for path in srcs]
 
 
 class MoveCommand(CommandBase):
@@ -430,6 +1485,8 @@ class MoveCommand(CommandBase):
 
         client = self.session_manager(src['nameservice'])
         client.rename(src['path'], dest['path'])
+        self._invalidate_path(src['path'], src['nameservice'], recursively=True)
+        self._invalidate_path(dest['path'], dest['nameservice'], recursively=True)
         return CommandResult(data="Success")
 
 
@@ -438,7 +1495,7 @@ class RemoveCommand(CommandBase):
         remove -r -f hdfs path
     """
     def execute(self, paths, **kwargs):
-        for path in paths:
+        for path in self._expand_paths(paths, "-rm"):
             status = self._get_path_detail(path['path'], path['nameservice'])
             if not status:
                 raise CommandExecuteException("-rm: `%s` No such file or directory" % path['path'])
@@ -452,62 +1509,87 @@ class RemoveCommand(CommandBase):
 
 class ChmodCommand(CommandBase):
     """
-        -chmod octal_mode path
+        -chmod [-R] octal_mode path
     """
-    def execute(self, octal_mode, paths, **kwargs):
-        for path in paths:
-            client = self.session_manager(path['nameservice'])
-            client.set_permission(path['path'], octal_mode)
 
-        return CommandResult(data="Success")
+    command = "-chmod"
+
+    def execute(self, octal_mode, paths, **kwargs):
+        paths = self._expand_paths(paths, self.command)
+        return self._change_tree(paths, lambda client, hdfs_path: client.set_permission(hdfs_path, octal_mode),
+                                 recursively=kwargs.get("recursively"))
 
 
 class ChownCommand(CommandBase):
     """
-        -chown user[:group] path
+        -chown [-R] user[:group] path
     """
+
+    command = "-chown"
+
     def execute(self, owner, paths, **kwargs):
         pattern = r"(\w+):(\w+)"
-        for path in paths:
-            match = re.findall(pattern, owner)
+        match = re.findall(pattern, owner)
 
-            group = None
-            if match and len(re.findall(":", owner)) == 1:
-                owner, group = match.pop()
+        group = None
+        if match and len(re.findall(":", owner)) == 1:
+            owner, group = match.pop()
 
-            client = self.session_manager(path['nameservice'])
-            client.set_owner(path['path'], owner=owner, group=group)
-        return CommandResult(data="Success")
+        paths = self._expand_paths(paths, self.command)
+        return self._change_tree(paths, lambda client, hdfs_path: client.set_owner(hdfs_path, owner=owner, group=group),
+                                 recursively=kwargs.get("recursively"))
 
 
 class ChgrpCommand(CommandBase):
     """
-        -chgrp group path
+        -chgrp [-R] group path
     """
+
+    command = "-chgrp"
+
     def execute(self, group, paths, **kwargs):
-        for path in paths:
-            client = self.session_manager(path['nameservice'])
-            client.set_owner(path['path'], group=group)
-        return CommandResult(data="Success")
+        paths = self._expand_paths(paths, self.command)
+        return self._change_tree(paths, lambda client, hdfs_path: client.set_owner(hdfs_path, group=group),
+                                 recursively=kwargs.get("recursively"))
 
 
 class CountCommand(CommandBase):
     """
         -count get path Content
     """
+
+    # -v header, same names as hadoop fs -count -v
+    header_names = OrderedDict([
+        ("quota", "QUOTA"),
+        ("spaceQuota", "SPACE_QUOTA"),
+        ("spaceConsumed", "SPACE_CONSUMED"),
+        ("directoryCount", "DIR_COUNT"),
+        ("fileCount", "FILE_COUNT"),
+        ("length", "CONTENT_SIZE"),
+        ("path", "PATHNAME")
+    ])
+
     def execute(self, paths, **kwargs):
         quota = kwargs.get("quota", False)
         humanized = kwargs.get("humanized", False)
+        header = kwargs.get("header", False)
 
         fields = []
         if quota:
             fields.extend(["quota", "spaceQuota", "spaceConsumed"])
         fields.extend(["directoryCount", "fileCount", "length"])
 
-        data = []
-        for path in paths:
+        def content(path):
             client = self.session_manager(path['nameservice'])
-            response = client.content(path['path'])
+            return client.content(path['path'])
+
+        data = []
+        message = ""
+        paths = self._expand_paths(paths, "-count")
+        for path, response, error in tools.map_in_pool(content, paths, config.summary_threads()):
+            if error is not None:
+                message += "-count: `%s`: %s\n" % (path['source_path'], error)
+                continue
 
             d = OrderedDict()
             for field in fields:
@@ -523,7 +1605,339 @@ class CountCommand(CommandBase):
             data.append(d)
 
         df = self._trans_to_dataframe(data)
-        return CommandResult(data=df)
+        if header:
+            df = df.rename(columns=self.header_names)
+        return CommandResult(data=df, message=message or None)
+
+
+class CatCommand(CommandBase):
+    """
+        -cat path
+        stream file contents to the notebook with bounded range reads,
+        at most text_max_bytes are sent per command
+    """
+
+    command = "-cat"
+
+    def execute(self, paths, **kwargs):
+        self._budget = config.text_max_bytes()
+        message = ""
+        for path in self._expand_paths(paths, self.command):
+            status = self._get_path_detail(path['path'], path['nameservice'])
+            if not status:
+                message += "%s: `%s`: No such file or directory\n" % (self.command, path['source_path'])
+                continue
+            if status['type'] != HDFS_FILE_TYPE:
+                message += "%s: `%s`: Is a directory\n" % (self.command, path['source_path'])
+                continue
+
+            if self._budget <= 0 or not self.show(path, status['length'], **kwargs):
+                message += "%s: output truncated at %s bytes\n" % (self.command, config.text_max_bytes())
+                break
+
+        # contents went out as stream events
+        return CommandResult(data=None, message=message or None)
+
+    def show(self, path, length, **kwargs):
+        """
+            @return False if the output was cut by the byte cap
+        """
+        size = min(length, self._budget)
+        self._stream_range(path, 0, size)
+        return size == length
+
+    def _stream_range(self, path, offset, length, max_lines=None):
+        """
+            stream `length` bytes from offset, stop after max_lines lines
+            @return number of lines sent
+        """
+        lines = 0
+        if length <= 0:
+            return lines
+
+        client = self.session_manager(path['nameservice'])
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        with client.read(path['path'], offset=offset, length=length,
+                         chunk_size=config.text_chunk_size()) as reader:
+            for chunk in reader:
+                if max_lines is not None:
+                    count = chunk.count(b"\n")
+                    if lines + count >= max_lines:
+                        chunk = chunk[:self._nth_newline(chunk, max_lines - lines) + 1]
+                        self._send_bytes(decoder, chunk)
+                        lines = max_lines
+                        break
+                    lines += count
+                self._send_bytes(decoder, chunk)
+
+        self._send_bytes(decoder, b"", final=True)
+        return lines
+
+    def _send_bytes(self, decoder, data, final=False):
+        self.check_cancelled()
+        self._budget -= len(data)
+        text = decoder.decode(data, final)
+        if text:
+            self.emit("stream", text)
+
+    def _nth_newline(self, data, n):
+        position = -1
+        for _ in range(n):
+            position = data.find(b"\n", position + 1)
+        return position
+
+
+class HeadCommand(CatCommand):
+    """
+        -head [-c bytes | -n lines] path
+        first bytes or lines of a file
+    """
+
+    command = "-head"
+
+    def show(self, path, length, bytes_count=None, lines_count=None, **kwargs):
+        if lines_count:
+            # the cap bounds the read, the line count stops it early
+            size = min(length, self._budget)
+            lines = self._stream_range(path, 0, size, max_lines=lines_count)
+            return lines >= lines_count or size == length
+
+        wanted = min(length, bytes_count or config.text_default_bytes())
+        size = min(wanted, self._budget)
+        self._stream_range(path, 0, size)
+        return size == wanted
+
+
+class TailCommand(CatCommand):
+    """
+        -tail [-c bytes | -n lines] path
+        last bytes or lines of a file, read with an offset near EOF
+    """
+
+    command = "-tail"
+
+    def show(self, path, length, bytes_count=None, lines_count=None, **kwargs):
+        if lines_count:
+            return self._show_lines(path, length, lines_count)
+
+        wanted = min(length, bytes_count or config.text_default_bytes())
+        size = min(wanted, self._budget)
+        self._stream_range(path, length - size, size)
+        return size == wanted
+
+    def _show_lines(self, path, length, lines_count):
+        """
+            read growing windows back from EOF until one holds enough lines
+        """
+        client = self.session_manager(path['nameservice'])
+        window = config.text_chunk_size()
+        while True:
+            window = min(window, length, self._budget)
+            offset = length - window
+            with client.read(path['path'], offset=offset, length=window) as reader:
+                data = reader.read()
+
+            # a trailing newline ends the last line, it doesn't start one
+            body = data[:-1] if data.endswith(b"\n") else data
+            complete = body.count(b"\n") >= lines_count
+            if complete or offset == 0 or window >= self._budget:
+                break
+            window *= 2
+
+        start = 0
+        if complete:
+            start = len(body)
+            for _ in range(lines_count):
+                start = body.rfind(b"\n", 0, start)
+            start += 1
+
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._send_bytes(decoder, data[start:], final=True)
+        return complete or offset == 0
+
+
+class TextCommand(CatCommand):
+    """
+        -text [-c bytes | -n lines] path
+        stream a gzip/bzip2/deflate/snappy file through an incremental
+        decompressor, reading stops once the output limit is reached
+    """
+
+    command = "-text"
+
+    def show(self, path, length, bytes_count=None, lines_count=None, **kwargs):
+        budget = self._budget
+        limit = min(bytes_count, budget) if bytes_count else budget
+
+        sent = 0
+        lines = 0
+        capped = False
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        pieces = self._iter_decompressed(path)
+        try:
+            for piece in pieces:
+                stop = False
+                if sent + len(piece) >= limit:
+                    piece = piece[:limit - sent]
+                    stop = True
+                    capped = limit == budget
+
+                if lines_count:
+                    count = piece.count(b"\n")
+                    if lines + count >= lines_count:
+                        piece = piece[:self._nth_newline(piece, lines_count - lines) + 1]
+                        stop = True
+                        capped = False
+                    lines += count
+
+                sent += len(piece)
+                self._send_bytes(decoder, piece)
+                if stop:
+                    break
+        finally:
+            # closes the response, nothing more is downloaded
+            pieces.close()
+
+        self._send_bytes(decoder, b"", final=True)
+        return not capped
+
+    def _iter_decompressed(self, path):
+        client = self.session_manager(path['nameservice'])
+        chunk_size = config.text_chunk_size()
+        with client.read(path['path'], chunk_size=chunk_size) as reader:
+            chunks = iter(reader)
+            head = next(chunks, b"")
+            decompressor = get_decompressor(path['path'], head, piece_size=chunk_size)
+            for chunk in itertools.chain([head], chunks):
+                for piece in decompressor.feed(chunk):
+                    yield piece
+
+
+class SchemaCommand(CommandBase):
+    """
+        -schema [-s] [-h] path
+        decode parquet/orc footers with tail range reads,
+        part files of a directory are inspected concurrently
+    """
+
+    command = "-schema"
+
+    def execute(self, paths, **kwargs):
+        files = []
+        for path in self._expand_paths(paths, self.command):
+            status = self._get_path_detail(path['path'], path['nameservice'])
+            if not status:
+                raise CommandExecuteException("%s: `%s`: No such file or directory" \
+                                              % (self.command, path['source_path']))
+
+            if status['type'] == HDFS_FILE_TYPE:
+                files.append((path['nameservice'], path['path'], status['length']))
+                continue
+
+            # part files, skip _SUCCESS, .crc and empty files
+            for path_suffix, detail in self._list_path(path['path'], path['nameservice']):
+                if detail['type'] == HDFS_FILE_TYPE and detail['length'] \
+                        and not path_suffix.startswith(("_", ".")):
+                    files.append((path['nameservice'],
+                                  self._get_full_path(path['path'], path_suffix),
+                                  detail['length']))
+
+        message = ""
+        results = []
+        for item, footer, error in tools.map_in_pool(self._read_footer, files, config.footer_threads()):
+            if error is not None:
+                message += "%s: `%s`: %s\n" % (self.command, item[1], error)
+                continue
+            results.append((item[1], footer))
+
+        if not results:
+            return CommandResult(status=False, message=message or "%s: no files found" % self.command)
+
+        if kwargs.get("summary"):
+            df = self._pack_summary(results, **kwargs)
+        else:
+            df = self._pack_columns(results, **kwargs)
+        return CommandResult(data=df, message=message or None)
+
+    def _read_footer(self, item):
+        """
+            read footer_read_size bytes before EOF, a second range
+            read fetches the rest of a larger footer
+        """
+        nameservice, hdfs_path, length = item
+        client = self.session_manager(nameservice)
+
+        size = min(length, config.footer_read_size())
+        tail = self._read_range(client, hdfs_path, length - size, size)
+        needed = footers.footer_size(tail)
+        if needed > length:
+            raise CommandExecuteException("footer of %s bytes exceeds the file size" % needed)
+
+        if needed > len(tail):
+            missing = needed - len(tail)
+            tail = self._read_range(client, hdfs_path, length - needed, missing) + tail
+
+        return footers.parse_footer(tail)
+
+    def _read_range(self, client, hdfs_path, offset, size):
+        with client.read(hdfs_path, offset=offset, length=size) as reader:
+            return reader.read()
+
+    def _pack_columns(self, results, humanized=False, **kwargs):
+        """
+            one row per column, sizes summed over all files
+        """
+        columns = OrderedDict()
+        for _, footer in results:
+            for column in footer['columns']:
+                d = columns.get(column['column'])
+                if d is None:
+                    columns[column['column']] = OrderedDict(column)
+                    continue
+
+                if column['type'] not in d['type'].split(" | "):
+                    d['type'] += " | %s" % column['type']
+                for field in ("compressedSize", "uncompressedSize"):
+                    if d[field] is not None and column[field] is not None:
+                        d[field] += column[field]
+
+        data = list(columns.values())
+        if humanized:
+            self._humanize(data, ("compressedSize", "uncompressedSize"))
+        return self._trans_to_dataframe(data)
+
+    def _pack_summary(self, results, humanized=False, **kwargs):
+        """
+            one row per file, with a total row for several files
+        """
+        fields = ("rowGroups", "rows", "compressedSize", "uncompressedSize")
+        data = []
+        for hdfs_path, footer in results:
+            d = OrderedDict()
+            d['path'] = hdfs_path
+            d['format'] = footer['format']
+            for field in fields:
+                d[field] = footer[field]
+            data.append(d)
+
+        if len(data) > 1:
+            total = OrderedDict()
+            total['path'] = "total (%s files)" % len(data)
+            total['format'] = ",".join(sorted(set(d['format'] for d in data)))
+            for field in fields:
+                values = [d[field] for d in data]
+                total[field] = None if None in values else sum(values)
+            data.append(total)
+
+        if humanized:
+            self._humanize(data, ("compressedSize", "uncompressedSize"))
+        return self._trans_to_dataframe(data)
+
+    def _humanize(self, data, fields):
+        for d in data:
+            for field in fields:
+                if d[field] is not None:
+                    d[field] = tools.convert_size_readable(d[field])
 
 
 class CommandDispatcher(object):
@@ -531,7 +1945,9 @@ class CommandDispatcher(object):
     _map = {
         "-ls": ListCommand,
         "-du": DuCommand,
+        "-find": FindCommand,
         "-get": GetCommand,
+        "-getmerge": GetMergeCommand,
         "-put": PutCommand,
         "-copyFromLocal": PutCommand,
         "-mkdir": MkdirCommand,
@@ -541,12 +1957,18 @@ class CommandDispatcher(object):
         "-chmod": ChmodCommand,
         "-chown": ChownCommand,
         "-chgrp": ChgrpCommand,
-        "-count": CountCommand
+        "-count": CountCommand,
+        "-cat": CatCommand,
+        "-head": HeadCommand,
+        "-tail": TailCommand,
+        "-text": TextCommand,
+        "-schema": SchemaCommand
     }
 
-    def __init__(self, command, session_manager):
+    def __init__(self, command, session_manager, event_handler=None, cancel_token=None):
         assert command in self._map, "Command Not Found"
-        self.executer = self._map.get(command)(session_manager)
+        self.executer = self._map.get(command)(session_manager, event_handler=event_handler,
+                                               cancel_token=cancel_token)
 
     def execute(self, *args, **kwargs):
         return self.executer.execute(*args, **kwargs)
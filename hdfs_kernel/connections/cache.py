@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Hdfs metadata cache shared by all commands of a kernel
+"""
+
+import time
+import posixpath as psp
+from threading import Lock
+from collections import OrderedDict
+
+
+class MetadataCache(object):
+    """
+        per nameservice FileStatus and listing cache
+        entries expire after `ttl` seconds, the least recently used
+        entries are evicted once more than `maxsize` are stored,
+        missing paths (None) are never cached
+    """
+
+    STATUS = "status"
+    LISTING = "listing"
+
+    def __init__(self, ttl=10, maxsize=10000, max_listing=10000):
+        """
+            @params ttl seconds an entry stays valid
+            @params maxsize max number of entries
+            @params max_listing listings longer than this are not cached
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.max_listing = max_listing
+        self.hits = 0
+        self.misses = 0
+
+        # {(nameservice, kind, path): (expire_at, value)}
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, nameservice, kind, path):
+        """
+            @return (found, value)
+        """
+        key = (nameservice, kind, psp.normpath(path))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, self._copy(entry[1])
+
+    def put(self, nameservice, kind, path, value):
+        # a path created outside the kernel must show up right away
+        if value is None:
+            return
+        if kind == self.LISTING and len(value) > self.max_listing:
+            return
+
+        key = (nameservice, kind, psp.normpath(path))
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, self._copy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, nameservice, kind, path, loader):
+        found, value = self.get(nameservice, kind, path)
+        if found:
+            return value
+
+        value = loader()
+        self.put(nameservice, kind, path, value)
+        return value
+
+    def invalidate(self, nameservice, path, recursive=False):
+        """
+            drop entries of path and of its ancestors,
+            with recursive also every entry below path
+        """
+        path = psp.normpath(path)
+        paths = set([path])
+        parent = path
+        while parent not in ("/", "", "."):
+            parent = psp.dirname(parent)
+            paths.add(parent)
+
+        prefix = path.rstrip("/") + "/"
+        with self._lock:
+            for key in list(self._entries):
+                key_nameservice, _, key_path = key
+                if key_nameservice != nameservice:
+                    continue
+                if key_path in paths or (recursive and key_path.startswith(prefix)):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries)
+            }
+
+    def _copy(self, value):
+        # callers modify FileStatus dicts in place
+        if isinstance(value, dict):
+            return dict(value)
+        if isinstance(value, list):
+            return [(path_suffix, dict(detail)) for path_suffix, detail in value]
+        return value
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Hdfs path completion for do_complete
+"""
+
+import posixpath as psp
+from concurrent.futures import TimeoutError
+import hdfs_kernel.utils.configuration as config
+from hdfs_kernel.utils.tools import SingleFlight
+from hdfs_kernel.connections.cache import MetadataCache
+from hdfs_kernel.constants import HDFS_PREFIX, RESOLVED_PREFIX, HDFS_DIRECTORY_TYPE
+
+
+class HdfsCompleter(object):
+    """
+        complete "hdfs://ns/..." and "/..." tokens from the completion
+        tree cache, one completion lists at most the parent directory
+        of the token and waits for it at most completion_timeout seconds,
+        a listing which takes longer still fills the cache for the next Tab
+
+        completer = HdfsCompleter(session_manager)
+        completer.complete("hdfs://ns1/user/hi")
+    """
+
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+        self._listings = SingleFlight(max_workers=2)
+
+    def complete(self, token):
+        """
+            @return list of completed tokens
+        """
+        protocol = ""
+        for prefix in (HDFS_PREFIX, RESOLVED_PREFIX):
+            if token.startswith(prefix):
+                protocol = prefix
+        if not protocol and not token.startswith("/"):
+            return []
+
+        nameservices = config.web_hdfs_name_services()
+        if protocol:
+            rest = token[len(protocol):]
+            if "/" not in rest:
+                return [protocol + nameservice + "/" for nameservice in sorted(nameservices)
+                        if nameservice.startswith(rest)]
+            nameservice, path = rest[:rest.index("/")], rest[rest.index("/"):]
+            if nameservice not in nameservices:
+                return []
+            path_service = protocol + nameservice
+        else:
+            nameservice, path, path_service = config.default_name_service(), token, ""
+
+        directory, name = psp.split(path)
+        listing = self._list_directory(nameservice, directory)
+        if listing is None:
+            return []
+
+        matches = []
+        for path_suffix, status in listing:
+            if not path_suffix.startswith(name):
+                continue
+            completed = path_service + psp.join(directory, path_suffix)
+            if status['type'] == HDFS_DIRECTORY_TYPE:
+                completed += "/"
+            matches.append(completed)
+            if len(matches) >= config.completion_max_matches():
+                break
+        return sorted(matches)
+
+    def _list_directory(self, nameservice, directory):
+        """
+            @return [(path suffix, {"type": ...}), ...] or None on timeout or error
+        """
+        cache = self.session_manager.completion_cache
+        found, listing = cache.get(nameservice, MetadataCache.LISTING, directory)
+        if found:
+            return listing
+
+        # a listing a command fetched recently is as good
+        found, listing = self.session_manager.metadata_cache.get(
+            nameservice, MetadataCache.LISTING, directory)
+        if found:
+            cache.put(nameservice, MetadataCache.LISTING, directory, self._compact(listing))
+            return listing
+
+        future = self._listings.submit((nameservice, directory), self._fetch, nameservice, directory)
+        try:
+            return future.result(timeout=config.completion_timeout())
+        except TimeoutError:
+            return None
+        except Exception:
+            # missing directory, a file or a connection problem: nothing to offer
+            return None
+
+    def _fetch(self, nameservice, directory):
+        client = self.session_manager(nameservice)
+        listing = self._compact(client.list(directory, status=True))
+        self.session_manager.completion_cache.put(nameservice, MetadataCache.LISTING,
+                                                  directory, listing)
+        return listing
+
+    def _compact(self, listing):
+        # completion only needs names and types
+        return [(path_suffix, {"type": status['type']}) for path_suffix, status in listing]
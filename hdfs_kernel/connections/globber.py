@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Hdfs glob expansion
+"""
+
+import posixpath as psp
+from hdfs_kernel.utils import tools
+from hdfs_kernel.constants import HDFS_DIRECTORY_TYPE
+from hdfs_kernel.parsers.paths import has_glob, expand_braces, glob_to_regex
+
+
+class HdfsGlobber(object):
+    """
+        resolve a pattern like /data/logs/2026-*/part-* level by level,
+        only directories matched by the previous level are listed and
+        the listings of one level run concurrently
+
+        globber = HdfsGlobber(list_dir, get_status, threads=8)
+        globber.glob("/data/{a,b}/2026-*")
+    """
+
+    def __init__(self, list_dir, get_status, threads=8):
+        """
+            @params list_dir callable(path) -> [(path suffix, FileStatus), ...]
+            @params get_status callable(path) -> FileStatus or None
+            @params threads listings in flight
+        """
+        self.list_dir = list_dir
+        self.get_status = get_status
+        self.threads = threads
+
+    def glob(self, pattern):
+        """
+            @return sorted list of existing paths matching pattern
+        """
+        matches = set()
+        for expanded in expand_braces(pattern):
+            matches.update(self._glob_one(expanded))
+        return sorted(matches)
+
+    def _glob_one(self, pattern):
+        components = [c for c in psp.normpath(pattern).split("/") if c]
+
+        # [(path, verified)], a path is verified once seen in a listing
+        current = [("/", True)]
+        for index, component in enumerate(components):
+            is_last = index == len(components) - 1
+            if not has_glob(component):
+                current = [(psp.join(path, component), False) for path, _ in current]
+                continue
+
+            regex = glob_to_regex(component)
+            parents = [path for path, _ in current]
+            current = []
+            for parent, listing, error in tools.map_in_pool(self.list_dir, parents, self.threads):
+                if error is not None:
+                    # missing parent or a file, nothing matches below it
+                    continue
+                for path_suffix, status in listing:
+                    if not regex.match(path_suffix):
+                        continue
+                    if not is_last and status['type'] != HDFS_DIRECTORY_TYPE:
+                        continue
+                    current.append((psp.join(parent, path_suffix), True))
+
+            if not current:
+                return []
+
+        unverified = [path for path, verified in current if not verified]
+        existing = set(path for path, status, error
+                       in tools.map_in_pool(self.get_status, unverified, self.threads)
+                       if error is None and status)
+
+        return [path for path, verified in current if verified or path in existing]
@@ -10,14 +10,36 @@
 
 import hdfs_kernel.utils.configuration as config
 from hdfs.ext.kerberos import KerberosClient as KerberosClientBase
+from hdfs.client import _Request
+from hdfs.util import HdfsError
 import posixpath as psp
+import requests
+from requests.adapters import HTTPAdapter
 
 class HdfsKerberosClient(KerberosClientBase):
 
+    # WebHDFS endpoints missing from hdfs.Client
+    _concat = _Request('POST')
+    # the metaclass would strip the underscore of the operation name
+    _list_status_batch = _Request('GET').to_method('LISTSTATUS_BATCH')
+
     def __init__(self, nameservice, **kwargs):
         urls = self._build_urls(nameservice)
+        kwargs.setdefault("session", self._build_session())
         super(HdfsKerberosClient, self).__init__(urls, **kwargs)
 
+    def _build_session(self):
+        """
+            keep one pooled connection per transfer thread,
+            the requests default (10) would drop connections under parallel copies
+        """
+        pool_size = config.max_transfer_threads()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
     def _build_urls(self, nameservice, port=50070):
         ha_urls = []
         nodes = config.web_hdfs_nodes().get(nameservice)
@@ -33,3 +55,39 @@ class HdfsKerberosClient(KerberosClientBase):
             some path start with "resolved", so overwrite it
         """
         return psp.normpath(hdfs_path)
+
+    def concat(self, hdfs_path, sources):
+        """
+            append sources to the end of hdfs_path, sources are removed
+            @params hdfs_path existing target file
+            @params sources ordered list of file paths
+        """
+        sources = ",".join(self.resolve(source) for source in sources)
+        self._concat(hdfs_path, sources=sources)
+
+    def list_batches(self, hdfs_path):
+        """
+            iterative listing, one NameNode page per request
+            falls back to a single LISTSTATUS on NameNodes without LISTSTATUS_BATCH
+            @return generator of [(path suffix, FileStatus), ...]
+        """
+        hdfs_path = self.resolve(hdfs_path)
+        start_after = None
+        while True:
+            try:
+                response = self._list_status_batch(hdfs_path, startAfter=start_after)
+            except HdfsError as e:
+                if start_after is None and \
+                        e.exception in ("IllegalArgumentException", "UnsupportedOperationException"):
+                    yield self.list(hdfs_path, status=True)
+                    return
+                raise
+
+            listing = response.json()['DirectoryListing']
+            statuses = listing['partialListing']['FileStatuses']['FileStatus']
+            if statuses:
+                yield [(s['pathSuffix'], s) for s in statuses]
+
+            if not statuses or not listing['remainingEntries']:
+                return
+            start_after = statuses[-1]['pathSuffix']
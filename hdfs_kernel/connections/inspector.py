@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Hdfs path description for do_inspect
+"""
+
+import time
+from datetime import datetime
+from concurrent.futures import TimeoutError
+import hdfs_kernel.utils.configuration as config
+from hdfs_kernel.utils import tools
+from hdfs_kernel.utils.tools import SingleFlight
+from hdfs_kernel.connections.cache import MetadataCache
+from hdfs_kernel.parsers.paths import HdfsPath, is_hdfs_path
+from hdfs_kernel.constants import HDFS_DIRECTORY_TYPE
+
+
+class HdfsInspector(object):
+    """
+        describe the path under the cursor from the inspection cache,
+        FileStatus is awaited at most inspect_timeout seconds, the content
+        summary of a directory is fetched in the background and shows up
+        on the next inspection once it is ready
+
+        inspector = HdfsInspector(session_manager)
+        inspector.inspect("hdfs://ns1/user/hive")
+    """
+
+    SUMMARY = "summary"
+
+    def __init__(self, session_manager):
+        self.session_manager = session_manager
+        self._requests = SingleFlight(max_workers=4)
+
+    def inspect(self, token):
+        """
+            @return text, or None when token is not an existing hdfs path
+        """
+        if not is_hdfs_path(token):
+            return None
+
+        hdfs_path = HdfsPath(token)
+        nameservice = hdfs_path['nameservice']
+        path = hdfs_path['path'] or "/"
+        deadline = time.monotonic() + config.inspect_timeout()
+
+        # a status a command fetched recently is as good
+        found, status = self.session_manager.metadata_cache.get(nameservice, MetadataCache.STATUS, path)
+        if not found:
+            ready, status = self._load(nameservice, MetadataCache.STATUS, path, deadline)
+            if not ready:
+                return "%s\nstill loading, inspect again" % token
+        if not status:
+            return None
+
+        lines = [token]
+        lines.append(self._field("Type", status['type']))
+        if status['type'] != HDFS_DIRECTORY_TYPE:
+            lines.append(self._field("Size", tools.convert_size_readable(status['length'])))
+            lines.append(self._field("Replication", status['replication']))
+            lines.append(self._field("Block size", tools.convert_size_readable(status['blockSize'])))
+        lines.append(self._field("Owner", "%s:%s" % (status['owner'], status['group'])))
+        lines.append(self._field("Permission", status['permission']))
+        lines.append(self._field("Modified", datetime.fromtimestamp(status['modificationTime'] / 1000)
+                                 .strftime("%Y-%m-%d %H:%M:%S")))
+
+        if status['type'] == HDFS_DIRECTORY_TYPE:
+            ready, summary = self._load(nameservice, self.SUMMARY, path, deadline)
+            if not ready:
+                lines.append(self._field("Size", "computing in the background, inspect again"))
+            elif summary is None:
+                lines.append(self._field("Size", "unavailable"))
+            else:
+                lines.append(self._field("Size", "%s (%s with replicas)" % (
+                    tools.convert_size_readable(summary['length']),
+                    tools.convert_size_readable(summary['spaceConsumed']))))
+                lines.append(self._field("Files", "%s in %s directories" % (
+                    summary['fileCount'], summary['directoryCount'])))
+
+        return "\n".join(lines)
+
+    def _field(self, name, value):
+        return "%-12s %s" % (name + ":", value)
+
+    def _load(self, nameservice, kind, path, deadline):
+        """
+            @return (ready, value), value is None for a missing path or an error
+        """
+        cache = self.session_manager.inspect_cache
+        found, value = cache.get(nameservice, kind, path)
+        if found:
+            return True, value
+
+        future = self._requests.submit((nameservice, kind, path), self._fetch, nameservice, kind, path)
+        try:
+            return True, future.result(timeout=max(0, deadline - time.monotonic()))
+        except TimeoutError:
+            return False, None
+        except Exception:
+            return True, None
+
+    def _fetch(self, nameservice, kind, path):
+        client = self.session_manager(nameservice)
+        if kind == self.SUMMARY:
+            value = client.content(path, strict=False)
+        else:
+            value = client.status(path, strict=False)
+        self.session_manager.inspect_cache.put(nameservice, kind, path, value)
+        return value
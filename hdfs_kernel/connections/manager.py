@@ -4,20 +4,44 @@
 # Author: huangnj
 # Time: 2019/09/27
 
+import time
+from threading import Lock
+import hdfs_kernel.utils.configuration as config
 from hdfs_kernel.utils.loggers import HdfsLog
 from hdfs_kernel.exceptions import SessionManagementException
-from hdfs_kernel.connections.hdfs_client import HdfsKerberosClient
+from hdfs_kernel.connections.cache import MetadataCache
 
 
 
 class HdfsSessionManager(object):
 
     def __init__(self, client_class=None):
-        self.client_class = client_class or HdfsKerberosClient
+        # None until the first session, see _get_client_class
+        self.client_class = client_class
         self.logger = HdfsLog(__name__)
 
         # {nameserviceservice: session}
         self._sessions = dict()
+        # commands share the manager between worker threads
+        self._lock = Lock()
+
+        # FileStatus and listing cache of every nameservice
+        self.metadata_cache = MetadataCache(
+            ttl=config.metadata_cache_ttl(),
+            maxsize=config.metadata_cache_size(),
+            max_listing=config.metadata_cache_max_listing()
+        )
+        # names and types only, longer lived, for tab completion
+        self.completion_cache = MetadataCache(
+            ttl=config.completion_cache_ttl(),
+            maxsize=config.metadata_cache_size(),
+            max_listing=config.completion_cache_max_listing()
+        )
+        # FileStatus and content summaries shown by do_inspect
+        self.inspect_cache = MetadataCache(
+            ttl=config.inspect_cache_ttl(),
+            maxsize=config.inspect_cache_size()
+        )
 
     def get(self, nameservice):
         return self._sessions.get(nameservice)
@@ -33,14 +57,53 @@ class HdfsSessionManager(object):
 
         self._sessions[nameservice].close()
         del self._sessions[nameservice]
+        for cache in self._caches():
+            cache.clear()
         self.logger.info("Hdfs Session: %s deleted" % nameservice)
 
+    def invalidate(self, nameservice, path, recursive=False):
+        """
+            drop cached metadata of a path which is about to change
+        """
+        for cache in self._caches():
+            cache.invalidate(nameservice, path, recursive=recursive)
+
+    def _caches(self):
+        return [self.metadata_cache, self.completion_cache, self.inspect_cache]
+
     def get_or_init(self, nameservice):
         session = self.get(nameservice)
-        if not session:
-            session = self.client_class(nameservice)
-            self.add_session(nameservice, session)
+        if session:
+            return session
+
+        with self._lock:
+            session = self.get(nameservice)
+            if not session:
+                session = self._get_client_class()(nameservice)
+                self.add_session(nameservice, session)
         return session
 
+    def prewarm(self, nameservices):
+        """
+            create sessions and make one request on each, so client
+            construction, the kerberos handshake and namenode discovery
+            are done before the first command, failures are only logged
+        """
+        for nameservice in nameservices:
+            start = time.time()
+            try:
+                self.get_or_init(nameservice).status("/")
+            except Exception as e:
+                self.logger.error("Prewarm of Hdfs Session %s failed: %r" % (nameservice, e))
+            else:
+                self.logger.info("Hdfs Session %s prewarmed in %.2fs" % (nameservice, time.time() - start))
+
+    def _get_client_class(self):
+        if self.client_class is None:
+            # requests_kerberos and its gssapi bindings are slow to import
+            from hdfs_kernel.connections.hdfs_client import HdfsKerberosClient
+            self.client_class = HdfsKerberosClient
+        return self.client_class
+
     def __call__(self, nameservice):
         return self.get_or_init(nameservice)
@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Concurrent breadth first directory walker
+"""
+
+import posixpath as psp
+from queue import Queue
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from hdfs_kernel.constants import HDFS_DIRECTORY_TYPE
+
+
+class HdfsTreeWalker(object):
+    """
+        keep up to `threads` directory listings in flight and yield
+        entries as soon as each listing returns
+
+        walker = HdfsTreeWalker(list_dir, threads=8, max_depth=2)
+        for relative_path, status, depth in walker.walk("/user/hive"):
+            ...
+    """
+
+    def __init__(self, list_dir, threads=8, max_depth=None, max_entries=None,
+                 should_descend=None):
+        """
+            @params list_dir callable(path) -> [(path suffix, FileStatus), ...]
+            @params threads listings in flight
+            @params max_depth None for unlimited, 1 lists the root only
+            @params max_entries stop after yielding this many entries
+            @params should_descend callable(relative path, FileStatus, depth) -> bool,
+                    a directory is not listed when it returns False
+        """
+        self.list_dir = list_dir
+        self.threads = max(1, threads)
+        self.max_depth = max_depth
+        self.max_entries = max_entries
+        self.should_descend = should_descend
+
+        # [(path, exception)] of sub directories which could not be listed
+        self.errors = []
+
+    def walk(self, root):
+        """
+            directories wait in a queue, at most `threads` listings are
+            in flight and finished ones are collected in completion order
+            @return generator of (path relative to root, FileStatus, depth)
+        """
+        executor = ThreadPoolExecutor(max_workers=self.threads)
+        # [(relative dir, depth)] still to list
+        todo = deque([("", 1)])
+        # (future, relative dir, depth) of finished listings
+        finished = Queue()
+        in_flight = 0
+        count = 0
+
+        def submit(relative_dir, depth):
+            future = executor.submit(self.list_dir, psp.join(root, relative_dir) if relative_dir else root)
+            future.add_done_callback(lambda done: finished.put((done, relative_dir, depth)))
+
+        try:
+            while todo or in_flight:
+                while todo and in_flight < self.threads:
+                    submit(*todo.popleft())
+                    in_flight += 1
+
+                future, relative_dir, depth = finished.get()
+                in_flight -= 1
+                error = future.exception()
+                if error is not None:
+                    if not relative_dir:
+                        raise error
+                    self.errors.append((psp.join(root, relative_dir), error))
+                    continue
+
+                entries = [(psp.join(relative_dir, path_suffix), status)
+                           for path_suffix, status in future.result()]
+
+                # queue sub directories before handing entries to the consumer
+                if self._descend(depth):
+                    for relative_path, status in entries:
+                        if status['type'] != HDFS_DIRECTORY_TYPE:
+                            continue
+                        if self.should_descend is None or \
+                                self.should_descend(relative_path, status, depth):
+                            todo.append((relative_path, depth + 1))
+
+                for relative_path, status in entries:
+                    yield relative_path, status, depth
+
+                    count += 1
+                    if self.max_entries and count >= self.max_entries:
+                        return
+        finally:
+            # at most `threads` listings are still running
+            executor.shutdown(wait=True)
+
+    def _descend(self, depth):
+        return self.max_depth is None or depth < self.max_depth
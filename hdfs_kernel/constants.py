@@ -26,23 +26,35 @@ EXPECTED_ERROR_MSG = "An error was encountered:\n{}"
 HDFS_PREFIX = "hdfs://"
 RESOLVED_PREFIX = "resolved://"
 
+# columnar json results, rendered by kernels/hdfs/kernel.js
+TABLE_MIMETYPE = "application/vnd.hdfs-kernel.table+json"
+
 HDFS_FILE_TYPE = "FILE"
 HDFS_DIRECTORY_TYPE = "DIRECTORY"
 
 HELP_TIPS = """
 Usage: hadoop fs [generic options]
-	[-chgrp GROUP PATH...]
-	[-chmod <MODE[,MODE]... | OCTALMODE> PATH...]
-	[-chown [OWNER][:[GROUP]] PATH...]
-	[-copyFromLocal [-f] [-p] [-l] <localsrc> ... <dst>]
+	[-cat <src> ...]
+	[-chgrp [-R] GROUP PATH...]
+	[-chmod [-R] <MODE[,MODE]... | OCTALMODE> PATH...]
+	[-chown [-R] [OWNER][:[GROUP]] PATH...]
+	[-copyFromLocal [-f] [-p] [-l] [-t <thread count>] <localsrc> ... <dst>]
 	[-count [-q] [-h] [-v] <path> ...]
-	[-cp [-f] [-p | -p[topax]] <src> ... <dst>]
+	[-cp [-f] [-t <thread count>] [-p | -p[topax]] <src> ... <dst>]
 	[-du [-s] [-h] <path> ...]
-	[-get [-p] [-ignoreCrc] [-crc] <src> ... <localdst>]
+	[-find <path> ... [-name | -iname <glob>] [-size [+-]N[kMGT]] [-mtime | -mmin [+-]N]
+	       [-type f|d] [-mindepth N] [-maxdepth N] [-prune <glob>] [-limit N]]
+	[-get [-p] [-ignoreCrc] [-crc] [-t <thread count>] <src> ... <localdst>]
+	[-getmerge [-nl] [-t <thread count>] <src> ... <localdst>]
+	[-head [-c <bytes> | -n <lines>] <src> ...]
 	[-help]
-	[-ls [-C] [-d] [-h] [-q] [-R] [-t] [-S] [-r] [-u] [<path> ...]]
+	[-ls [-C] [-d] [-h] [-q] [-R] [--depth <n>] [-t] [-S] [-r] [-u] [-n <limit>] [<path> ...]]
 	[-mkdir [-p] <path> ...]
 	[-mv <src> ... <dst>]
-	[-put [-f] [-p] [-l] <localsrc> ... <dst>]
+	[-page <page> [<result id>]]
+	[-put [-f] [-p] [-l] [-t <thread count>] <localsrc> ... <dst>]
 	[-rm [-f] [-r|-R] <src> ...]
+	[-schema [-s] [-h] <path> ...]
+	[-tail [-c <bytes> | -n <lines>] <src> ...]
+	[-text [-c <bytes> | -n <lines>] <src> ...]
 """
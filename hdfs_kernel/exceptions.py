@@ -19,6 +19,9 @@ class CommandNotAllowedException(Exception):
 class CommandExecuteException(Exception):
     pass
 
+class CommandCancelledException(Exception):
+    pass
+
 
 # option parse Error
 class OptionParsingError(RuntimeError):
@@ -33,7 +36,8 @@ class OptionParsingExit(Exception):
 
 # == DECORATORS FOR EXCEPTION HANDLING ==
 EXPECTED_EXCEPTIONS = [HdfsError, SessionManagementException, CommandNotAllowedException,
-                       CommandExecuteException, OptionParsingExit, OptionParsingError]
+                       CommandExecuteException, CommandCancelledException,
+                       OptionParsingExit, OptionParsingError]
 
 
 def handle_expected_exceptions(f):
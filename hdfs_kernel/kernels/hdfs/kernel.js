@@ -0,0 +1,312 @@
+/*
+ * Author: huangnj
+ * Time: 2019/10/08
+ *
+ * Renders application/vnd.hdfs-kernel.table+json results (columnar json sent
+ * by the kernel next to the html fallback) as a virtual scrolling table:
+ * only the rows in view are in the DOM, headers sort the loaded rows client
+ * side. Results carry one page, further pages of a stored result are loaded
+ * with a silent "hdfs dfs -page" when the table is scrolled to its end.
+ */
+
+define([
+    'jquery',
+    'base/js/namespace',
+    'notebook/js/outputarea'
+], function ($, Jupyter, outputarea) {
+    "use strict";
+
+    var MIME_TYPE = 'application/vnd.hdfs-kernel.table+json';
+    var ROW_HEIGHT = 24;
+    var VISIBLE_ROWS = 20;
+    // rows rendered above and below the viewport
+    var OVERSCAN = 10;
+    // rows sampled to size the columns
+    var WIDTH_SAMPLE = 200;
+
+    var STYLE = [
+        '.hdfs-table { font-size: 12px; }',
+        '.hdfs-table-scroll { overflow: auto; position: relative; border: 1px solid #ddd; }',
+        '.hdfs-table table { table-layout: fixed; border-collapse: collapse; margin: 0; }',
+        '.hdfs-table th, .hdfs-table td { height: ' + ROW_HEIGHT + 'px; padding: 0 8px; white-space: nowrap;' +
+            ' overflow: hidden; text-overflow: ellipsis; border-bottom: 1px solid #eee; text-align: right; }',
+        '.hdfs-table th { position: sticky; top: 0; z-index: 1; background: #f5f5f5; cursor: pointer;' +
+            ' user-select: none; }',
+        '.hdfs-table .hdfs-table-string { text-align: left; }',
+        '.hdfs-table-footer { color: #777; padding: 4px 0; }'
+    ].join('\n');
+
+    function TableView(payload, container) {
+        this.columns = payload.columns;
+        this.types = payload.types;
+        this.data = payload.data;
+        this.rows = payload.rows;
+        this.payload = payload;
+
+        // indexes into the column arrays, in display order
+        this.order = new Array(this.rows);
+        for (var i = 0; i < this.rows; i++) {
+            this.order[i] = i;
+        }
+        this.sortColumn = null;
+        this.sortAscending = true;
+        this.first = -1;
+        this.last = -1;
+        // a -page request is running, or the result left the kernel store
+        this.loading = false;
+        this.exhausted = payload.result_id === null;
+
+        this.build(container);
+        this.render(true);
+    }
+
+    TableView.prototype.build = function (container) {
+        var that = this;
+        var root = $('<div/>').addClass('hdfs-table');
+
+        this.scroll = $('<div/>').addClass('hdfs-table-scroll')
+            .css('max-height', (VISIBLE_ROWS + 1) * ROW_HEIGHT + 'px');
+
+        var table = $('<table/>').css('width', this.columnWidths().reduce(function (a, b) {
+            return a + b;
+        }, 0) + 'ch');
+        var colgroup = $('<colgroup/>');
+        this.columnWidths().forEach(function (width) {
+            colgroup.append($('<col/>').css('width', width + 'ch'));
+        });
+        table.append(colgroup);
+
+        var header = $('<tr/>');
+        this.headers = this.columns.map(function (name, index) {
+            var th = $('<th/>').text(name).attr('title', name)
+                .toggleClass('hdfs-table-string', that.types[index] !== 'number')
+                .on('click', function () {
+                    that.sort(index);
+                });
+            header.append(th);
+            return th;
+        });
+        table.append($('<thead/>').append(header));
+
+        // spacers stand in for the rows outside the rendered window
+        this.body = $('<tbody/>');
+        table.append(this.body);
+        this.scroll.append(table);
+
+        this.scroll.on('scroll', function () {
+            if (!that.pending) {
+                that.pending = true;
+                window.requestAnimationFrame(function () {
+                    that.pending = false;
+                    that.render(false);
+                });
+            }
+        });
+
+        root.append(this.scroll);
+        this.footerElement = $('<div/>').addClass('hdfs-table-footer').text(this.footer());
+        root.append(this.footerElement);
+        $(container).append(root);
+    };
+
+    TableView.prototype.columnWidths = function () {
+        if (this.widths) {
+            return this.widths;
+        }
+        var sample = Math.min(this.rows, WIDTH_SAMPLE);
+        this.widths = this.columns.map(function (name, index) {
+            var width = String(name).length + 2;
+            var values = this.data[index];
+            for (var i = 0; i < sample; i++) {
+                width = Math.max(width, String(values[i] === null ? 'NULL' : values[i]).length);
+            }
+            return Math.min(width, 60) + 2;
+        }, this);
+        return this.widths;
+    };
+
+    TableView.prototype.render = function (force) {
+        var top = this.scroll.scrollTop();
+        var first = Math.max(0, Math.floor(top / ROW_HEIGHT) - OVERSCAN);
+        var last = Math.min(this.rows, Math.ceil(top / ROW_HEIGHT) + VISIBLE_ROWS + OVERSCAN);
+        if (!force && first === this.first && last === this.last) {
+            return;
+        }
+        this.first = first;
+        this.last = last;
+
+        var columnCount = this.columns.length;
+        var html = [this.spacer(first, columnCount)];
+        for (var position = first; position < last; position++) {
+            var row = this.order[position];
+            html.push('<tr>');
+            for (var column = 0; column < columnCount; column++) {
+                var value = this.data[column][row];
+                html.push(this.types[column] === 'number' ? '<td>' : '<td class="hdfs-table-string">');
+                html.push(escapeHtml(value === null ? 'NULL' : String(value)));
+                html.push('</td>');
+            }
+            html.push('</tr>');
+        }
+        html.push(this.spacer(this.rows - last, columnCount));
+        this.body[0].innerHTML = html.join('');
+
+        if (last >= this.rows - OVERSCAN) {
+            this.loadMore();
+        }
+    };
+
+    TableView.prototype.loadedEnd = function () {
+        return this.payload.offset + this.rows;
+    };
+
+    TableView.prototype.loadMore = function () {
+        var kernel = Jupyter.notebook && Jupyter.notebook.kernel;
+        if (this.loading || this.exhausted || !kernel || this.loadedEnd() >= this.payload.total) {
+            return;
+        }
+
+        var that = this;
+        var page = Math.floor(this.loadedEnd() / this.payload.page_size) + 1;
+        this.loading = true;
+        kernel.execute('hdfs dfs -page ' + page + ' ' + this.payload.result_id, {
+            iopub: {
+                output: function (msg) {
+                    var data = msg.content.data && msg.content.data[MIME_TYPE];
+                    if (data) {
+                        that.append(data);
+                    }
+                }
+            },
+            shell: {
+                reply: function (msg) {
+                    if (msg.content.status !== 'ok') {
+                        that.exhausted = true;
+                        that.footerElement.text(that.footer());
+                    }
+                }
+            }
+        }, {silent: true, store_history: false});
+    };
+
+    TableView.prototype.append = function (page) {
+        this.loading = false;
+        if (page.offset !== this.loadedEnd() || !page.rows) {
+            // the stored result changed under the table, stop asking for it
+            this.exhausted = true;
+            this.footerElement.text(this.footer());
+            return;
+        }
+
+        for (var column = 0; column < this.columns.length; column++) {
+            var values = this.data[column];
+            page.data[column].forEach(function (value) {
+                values.push(value);
+            });
+        }
+        for (var row = this.rows; row < this.rows + page.rows; row++) {
+            this.order.push(row);
+        }
+        this.rows += page.rows;
+
+        if (this.sortColumn !== null) {
+            this.applySort();
+        }
+        this.footerElement.text(this.footer());
+        this.render(true);
+    };
+
+    TableView.prototype.spacer = function (rows, columnCount) {
+        if (!rows) {
+            return '';
+        }
+        return '<tr style="height: ' + rows * ROW_HEIGHT + 'px"><td colspan="' + columnCount +
+            '" style="padding: 0; border: 0"></td></tr>';
+    };
+
+    TableView.prototype.sort = function (column) {
+        if (this.sortColumn === column) {
+            this.sortAscending = !this.sortAscending;
+        } else {
+            this.sortColumn = column;
+            this.sortAscending = true;
+        }
+        this.applySort();
+        this.render(true);
+    };
+
+    TableView.prototype.applySort = function () {
+        var column = this.sortColumn;
+        var values = this.data[column];
+        var direction = this.sortAscending ? 1 : -1;
+        var numeric = this.types[column] === 'number';
+        this.order.sort(function (a, b) {
+            var x = values[a], y = values[b];
+            // nulls last in both directions
+            if (x === null || y === null) {
+                return x === y ? a - b : (x === null ? 1 : -1);
+            }
+            if (numeric) {
+                return (x - y) * direction || a - b;
+            }
+            return (x < y ? -1 : x > y ? 1 : a - b) * (x === y ? 1 : direction);
+        });
+
+        var that = this;
+        this.headers.forEach(function (th, index) {
+            var name = that.columns[index];
+            th.text(index === column ? name + (that.sortAscending ? ' ▲' : ' ▼') : name);
+        });
+    };
+
+    TableView.prototype.footer = function () {
+        var payload = this.payload;
+        var text = this.rows + ' rows';
+        if (payload.total > this.rows) {
+            text = 'Rows ' + (payload.offset + 1) + '-' + this.loadedEnd() + ' of ' + payload.total;
+        }
+        if (payload.result_id !== null) {
+            text += ' (result ' + payload.result_id + ')';
+        }
+        if (this.loadedEnd() < payload.total) {
+            text += this.exhausted ? ', no longer stored, run the command again'
+                : ', scroll down to load more';
+        }
+        if (this.sortColumn !== null && payload.total > this.rows) {
+            text += ', sorting covers the loaded rows';
+        }
+        return text;
+    };
+
+    function escapeHtml(text) {
+        return text.replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;');
+    }
+
+    function appendTable(payload, metadata, element) {
+        var toinsert = this.create_output_subarea(metadata, 'output_html rendered_html', MIME_TYPE);
+        this.keyboard_manager.register_events(toinsert);
+        element.append(toinsert);
+        // sizes are only known once attached
+        new TableView(payload, toinsert);
+        return toinsert;
+    }
+
+    function onload() {
+        if (!document.getElementById('hdfs-table-style')) {
+            $('<style/>').attr('id', 'hdfs-table-style').text(STYLE).appendTo('head');
+        }
+
+        var OutputArea = outputarea.OutputArea;
+        if (!OutputArea.append_map[MIME_TYPE]) {
+            // registers on the class, so every output area prefers the json table over html
+            OutputArea.prototype.register_mime_type(MIME_TYPE, appendTable, {
+                safe: true,
+                index: 0
+            });
+        }
+    }
+
+    return {
+        onload: onload
+    };
+});
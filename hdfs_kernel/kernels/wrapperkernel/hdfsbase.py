@@ -5,15 +5,24 @@
 # Time: 2019/09/24
 
 from ipykernel.kernelbase import Kernel
-from hdijupyterutils.ipythondisplay import IpythonDisplay
 from hdfs_kernel.parsers.code_parser import HdfsCodeParser
 from hdfs_kernel.connections.manager import HdfsSessionManager
+from hdfs_kernel.connections.completer import HdfsCompleter
+from hdfs_kernel.connections.inspector import HdfsInspector
 import getpass
 from hdfs_kernel.command import CommandDispatcher, CommandResult
 from hdfs_kernel.exceptions import handle_expected_exceptions, wrap_unexpected_exceptions
+import math
+import time
 import traceback
-from pandas import DataFrame
-from hdfs_kernel.constants import HELP_TIPS
+import uuid
+from threading import Lock, Thread
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from hdfs_kernel.utils import tools
+from hdfs_kernel.utils.tools import CancellationToken
+from hdfs_kernel.utils.result_store import ResultStore
+import hdfs_kernel.utils.configuration as config
+from hdfs_kernel.constants import HELP_TIPS, TABLE_MIMETYPE
 
 class HdfsKernelBase(Kernel):
 
@@ -29,14 +38,53 @@ class HdfsKernelBase(Kernel):
         super(HdfsKernelBase, self).__init__(**kwargs)
 
         self._fatal_error = None
-        self.ipython_display = IpythonDisplay()
+        self._ipython_display = None
         self.session_manager = HdfsSessionManager()
+        self.completer = HdfsCompleter(self.session_manager)
+        self.inspector = HdfsInspector(self.session_manager)
+
+        # {"partial" | "progress": display id} of displays updated in place
+        # while a command runs
+        self._display_ids = {}
+        self._last_progress = 0
+        self._display_lock = Lock()
+
+        # full DataFrames of results too large to render at once, see -page
+        self.result_store = ResultStore(config.result_store_size())
+
+        # commands run here, the shell thread only waits and handles interrupts
+        self._command_executor = ThreadPoolExecutor(max_workers=1)
+
+        if config.prewarm_sessions() != "none":
+            Thread(target=self._prewarm, name="hdfs-prewarm", daemon=True).start()
+
+    def _prewarm(self):
+        """
+            runs once at kernel start on a background thread
+        """
+        if config.prewarm_sessions() == "all":
+            nameservices = sorted(config.web_hdfs_name_services())
+        else:
+            nameservices = [config.default_name_service()]
+        self.session_manager.prewarm([nameservice for nameservice in nameservices if nameservice])
+
+        # the first table result would pay for it otherwise
+        tools.import_pandas()
+
+    @property
+    def ipython_display(self):
+        # IPython display machinery is only needed once something is displayed
+        if self._ipython_display is None:
+            from hdijupyterutils.ipythondisplay import IpythonDisplay
+            self._ipython_display = IpythonDisplay()
+        return self._ipython_display
 
     @wrap_unexpected_exceptions
     @handle_expected_exceptions
     def do_execute(self, code, silent, store_history=True,
                    user_expressions=None, allow_stdin=False):
 
+        self._display_ids = {}
         try:
             parse_result = HdfsCodeParser(code).parse()
             if parse_result['error']:
@@ -48,21 +96,164 @@ class HdfsKernelBase(Kernel):
                 self.send_info(HELP_TIPS)
                 return self.finish()
 
+            if command == "-page":
+                self.send_page(*parse_result['args'])
+                return self.finish()
+
             result = self.execute_hdfs_command(parse_result)
             assert isinstance(result, CommandResult), \
                 "Wrong type of command execute result, should be isinstance of  CommandResult "
+            self.clear_displays()
             self.send_result(result)
             return self.finish()
         except Exception as e:
             traceback.print_exc()
             print("%r" % e)
             raise e
+        finally:
+            # a failed command must not leave its progress bar behind
+            self.clear_displays()
+
+    def do_complete(self, code, cursor_pos):
+        """
+            complete sub commands and hdfs paths of the token before the cursor
+        """
+        cursor_pos = len(code) if cursor_pos is None else cursor_pos
+        line = code[:cursor_pos]
+        token = line.split()[-1] if line and not line[-1].isspace() else ""
+
+        if token.startswith("-"):
+            matches = [sub_command for sub_command in HdfsCodeParser.allow_sub_commands
+                       if sub_command.startswith(token)]
+        else:
+            matches = self.completer.complete(token)
+
+        return {
+            'status': 'ok',
+            'matches': matches,
+            'cursor_start': cursor_pos - len(token),
+            'cursor_end': cursor_pos,
+            'metadata': {}
+        }
+
+    def do_inspect(self, code, cursor_pos, detail_level=0, omit_sections=()):
+        """
+            describe the hdfs path under the cursor
+        """
+        cursor_pos = len(code) if cursor_pos is None else cursor_pos
+        before, after = code[:cursor_pos], code[cursor_pos:]
+        token = (before.split()[-1] if before and not before[-1].isspace() else "") + \
+                (after.split()[0] if after and not after[0].isspace() else "")
+        token = token.strip("'\"")
+
+        text = self.inspector.inspect(token) if token else None
+        return {
+            'status': 'ok',
+            'found': text is not None,
+            'data': {'text/plain': text} if text is not None else {},
+            'metadata': {}
+        }
 
     def execute_hdfs_command(self, command_settings):
         command = command_settings.get("command")
         args = command_settings.get("args")
         options = command_settings.get("options")
-        return CommandDispatcher(command, self.session_manager).execute(*args, **options)
+        cancel_token = CancellationToken()
+        dispatcher = CommandDispatcher(command, self.session_manager,
+                                       event_handler=self.handle_command_event,
+                                       cancel_token=cancel_token)
+        future = self._command_executor.submit(dispatcher.execute, *args, **options)
+        return self._wait_for_command(command, future, cancel_token, dispatcher.executer)
+
+    def _wait_for_command(self, command, future, cancel_token, executer):
+        """
+            a jupyter interrupt raises KeyboardInterrupt here, the command is
+            cancelled and stops at its next chunk or file
+        """
+        while True:
+            try:
+                return future.result(timeout=0.1)
+            except TimeoutError:
+                continue
+            except KeyboardInterrupt:
+                cancel_token.cancel()
+                break
+
+        message = "%s: interrupted after %s" % (command, executer.progress_summary())
+        try:
+            result = future.result(timeout=config.cancel_grace_seconds())
+        except TimeoutError:
+            # still blocked in a request, it stops at the next check
+            return CommandResult(status=False, message=message + ", still stopping")
+        except Exception:
+            return CommandResult(status=False, message=message)
+
+        # commands which collect per file errors return what they finished
+        result['message'] = message + "\n" + (result['message'] or "")
+        return result
+
+    def handle_command_event(self, event, data):
+        if event == "partial":
+            self.send_partial_result(data)
+        elif event == "progress":
+            self.send_progress(data)
+        elif event == "stream":
+            self.send_info(data)
+
+    def send_partial_result(self, partial):
+        """
+            render rows collected so far, later calls replace the same display
+        """
+        response = "<p>%s entries so far ...</p>%s" % (partial['count'], self.df_to_html(partial['data']))
+        self._update_display("partial", {"text/html": response})
+
+    def send_progress(self, progress):
+        """
+            render transfer progress, at most once per progress_interval
+        """
+        # events come from the command's worker threads
+        with self._display_lock:
+            now = time.time()
+            if now - self._last_progress < config.progress_interval():
+                return
+            self._last_progress = now
+
+        text = tools.convert_size_readable(progress['bytes'])
+        if progress['total_bytes']:
+            text += " / %s (%d%%)" % (tools.convert_size_readable(progress['total_bytes']),
+                                      100 * progress['bytes'] // progress['total_bytes'])
+        if progress['total_files']:
+            text += ", %s of %s files" % (progress['files'], progress['total_files'])
+        text += ", %s/s" % tools.convert_size_readable(int(progress['rate']))
+        if progress['eta'] is not None:
+            text += ", ETA %ds" % progress['eta']
+
+        html = "<p>%s</p>" % text
+        if progress['total_bytes']:
+            html = '<progress value="%s" max="%s"></progress>%s' % (
+                progress['bytes'], progress['total_bytes'], html)
+        self._update_display("progress", {"text/html": html, "text/plain": text})
+
+    def clear_displays(self):
+        for name in list(self._display_ids):
+            self._update_display(name, {"text/plain": ""})
+        with self._display_lock:
+            self._display_ids = {}
+            self._last_progress = 0
+
+    def _update_display(self, name, data):
+        # events come from the command's worker threads
+        with self._display_lock:
+            msg_type = 'update_display_data'
+            if name not in self._display_ids:
+                msg_type = 'display_data'
+                self._display_ids[name] = uuid.uuid4().hex
+
+            self.send_response(self.iopub_socket, msg_type, {
+                'data': data,
+                'metadata': {},
+                'transient': {'display_id': self._display_ids[name]}
+            })
 
     def df_to_html(self, df):
         return df.fillna('NULL').astype(str).to_html(notebook=True, index=False)
@@ -99,18 +290,108 @@ class HdfsKernelBase(Kernel):
             # Execute failed
             return self.send_error(result['message'])
 
-        if isinstance(result['data'], DataFrame):
-            response = self.df_to_html(result['data'])
+        if result['message']:
+            # partial failures of a successful command
+            self.send_error(result['message'])
+
+        if result['data'] is None:
+            # output already streamed
+            return
+
+        if tools.is_dataframe(result['data']):
+            response = self.dataframe_to_bundle(result['data'])
         else:
-            response = result['data']
+            response = {"text/html": result['data']}
+
+        self._send_execute_result(response)
+
+    def dataframe_to_bundle(self, df):
+        """
+            html and columnar json of at most default_maxrows rows, a larger
+            result is kept in the result store, the kernel.js table loads
+            further pages with -page
+            @return mime bundle
+        """
+        page_size = config.default_maxrows()
+        result_id = None
+        if len(df) <= page_size:
+            html = self.df_to_html(df)
+        else:
+            result_id = self.execution_count
+            self.result_store.put(result_id, df)
+            html = self._page_to_html(result_id, df, 1)
+
+        bundle = {"text/html": html}
+        if config.json_result():
+            bundle[TABLE_MIMETYPE] = self.df_to_table(df.iloc[:page_size], len(df), 0, result_id)
+        return bundle
+
+    def df_to_table(self, df, total, offset=0, result_id=None):
+        """
+            columnar json, one value list per column
+            @params total rows of the whole result
+            @params offset position of the first row in the whole result
+        """
+        dtypes = tools.import_pandas().api.types
+        types = []
+        data = []
+        for name in df.columns:
+            series = df[name]
+            if dtypes.is_numeric_dtype(series) and not dtypes.is_bool_dtype(series):
+                types.append("number")
+                data.append([value if value is not None and math.isfinite(value) else None
+                             for value in series.astype(object).tolist()])
+            else:
+                types.append("string")
+                data.append(series.fillna('NULL').astype(str).tolist())
+
+        return {
+            "columns": [str(name) for name in df.columns],
+            "types": types,
+            "data": data,
+            "rows": len(df),
+            "total": total,
+            "offset": offset,
+            "page_size": config.default_maxrows(),
+            "result_id": result_id
+        }
+
+    def send_page(self, page, result_id=None):
+        result_id, df = self.result_store.get(result_id)
+        if df is None:
+            return self.send_error("-page: no stored result%s, only results larger than %s rows are kept"
+                                   % (" %s" % result_id if result_id else "", config.default_maxrows()))
+
+        page_size = config.default_maxrows()
+        page_count = self.result_store.page_count(df, page_size)
+        if page > page_count:
+            return self.send_error("-page: result %s has %s pages" % (result_id, page_count))
+
+        response = {"text/html": self._page_to_html(result_id, df, page)}
+        if config.json_result():
+            response[TABLE_MIMETYPE] = self.df_to_table(self.result_store.page(df, page, page_size),
+                                                        len(df), (page - 1) * page_size, result_id)
+        self._send_execute_result(response)
+
+    def _page_to_html(self, result_id, df, page):
+        page_size = config.default_maxrows()
+        page_count = self.result_store.page_count(df, page_size)
+        start = (page - 1) * page_size
+
+        footer = "<p>Rows %s-%s of %s, page %s of %s (result %s)." % (
+            start + 1, min(start + page_size, len(df)), len(df), page, page_count, result_id)
+        if page < page_count:
+            footer += " Next page: <code>hdfs dfs -page %s %s</code>" % (page + 1, result_id)
+        footer += "</p>"
+
+        return self.df_to_html(self.result_store.page(df, page, page_size)) + footer
 
+    def _send_execute_result(self, response):
         self.send_response(
             self.iopub_socket,
             'execute_result', {
                 "execution_count": self.execution_count,
-                'data': {
-                    "text/html": response,
-                },
+                'data': response,
                 "metadata": {
                     "image/png": {
                         "width": 640,
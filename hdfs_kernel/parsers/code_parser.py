@@ -39,7 +39,8 @@ class HdfsCodeParser(CodeParser):
     allow_sub_commands = (
         "-ls", "-du", "-get", "-put", "-copyFromLocal", "-help",
         "-cp", "-mv", "-mkdir", "-rm", "-chmod", "-chown", "-chgrp",
-        "-count"
+        "-count", "-cat", "-head", "-tail", "-text",
+        "-schema", "-find", "-getmerge", "-page"
     )
 
     def parse(self):
@@ -4,7 +4,7 @@
 # Author: huangnj
 # Time: 2019/09/25
 
-from optparse import OptionParser
+from optparse import OptionParser, Values
 import re
 from .paths import is_hdfs_path, HdfsPath, is_local_path
 from hdfs_kernel.exceptions import OptionParsingExit, OptionParsingError
@@ -65,13 +65,17 @@ class ListOptionParser(OptionParserBase):
         # -C show path only
         opt_parser.add_option('-C', '--show_path_only', action='store_true', default=False, dest='show_path_only')
         # -R Recursively list the contents of directories
-        #opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
+        opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
+        # --depth  with -R, descend at most N levels
+        opt_parser.add_option('--depth', action='store', type='int', default=None, dest='max_depth')
         # -t  Sort files by modification time (most recent first).
         opt_parser.add_option('-t', '--sort_by_time', action='store_true', default=False, dest='sort_by_time')
         # -S  Sort files by size.
         opt_parser.add_option('-S', '--sort_by_size', action='store_true', default=False, dest='sort_by_size')
         # -r  Reverse the order of the sort.
         opt_parser.add_option('-r', '--reverse_sort', action='store_true', default=False, dest='reverse_sort')
+        # -n  Stop listing after N entries of each path, with -R stop the walk.
+        opt_parser.add_option('-n', '--limit', action='store', type='int', default=None, dest='limit')
         options, args = opt_parser.parse_args(options_list)
         hdfs_paths = self._parse_multi_path_args(args)
 
@@ -96,27 +100,99 @@ class DuOptionParser(OptionParserBase):
         return self.result_format(_args, options)
 
 
+class FindOptionParser(OptionParserBase):
+
+    command = "-find"
+
+    # find style expressions have single dash long names, optparse can't read them
+    # {expression: (dest, type, value pattern)}
+    expressions = {
+        "-name": ("name", str, None),
+        "-iname": ("iname", str, None),
+        "-size": ("size", str, r"^[+-]?\d+[kKmMgGtT]?$"),
+        "-mtime": ("mtime", str, r"^[+-]?\d+$"),
+        "-mmin": ("mmin", str, r"^[+-]?\d+$"),
+        "-type": ("file_type", str, r"^[fd]$"),
+        "-maxdepth": ("maxdepth", int, r"^\d+$"),
+        "-mindepth": ("mindepth", int, r"^\d+$"),
+        "-limit": ("limit", int, r"^[1-9]\d*$"),
+        "-prune": ("prune", str, None)
+    }
+
+    def parse(self, options_list):
+        args = []
+        options = Values()
+        items = iter(options_list)
+        for item in items:
+            if item not in self.expressions:
+                if item.startswith("-"):
+                    raise OptionParsingError("-find: Unexpected argument: %s" % item)
+                args.append(item)
+                continue
+
+            dest, value_type, pattern = self.expressions[item]
+            value = next(items, None)
+            if value is None or (pattern and not re.match(pattern, value)):
+                raise OptionParsingError("-find: Invalid argument for %s: %s" % (item, value))
+            setattr(options, dest, value_type(value))
+
+        paths = self._parse_multi_path_args(args)
+        if not paths:
+            self.error.append("command should be: -find <path> ... [-name <glob>] [-size [+-]N[kMGT]] "
+                              "[-mtime [+-]N] [-type f|d] [-maxdepth N] [-limit N]")
+        _args = (paths, )
+
+        return self.result_format(_args, options)
+
+
 class GetOptionParser(OptionParserBase):
 
     command = "-get"
 
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
+        # -t  transfer files on N threads
+        opt_parser.add_option('-t', '--threads', action='store', type='int', default=None, dest='threads')
         options, args = opt_parser.parse_args(options_list)
 
         paths = self._parse_multi_path_args(args)
-        src_path = None
+        src_paths = []
         dest_path = None
         if len(paths) == 1:
             # only src path
-            src_path = paths.pop()
-        elif len(paths) == 2:
-            # src path and destination path
-            src_path, dest_path = tuple(paths)
+            src_paths = paths
+        elif len(paths) >= 2:
+            # src paths and destination path
+            src_paths, dest_path = paths[:-1], paths[-1]
         else:
-            self.error.append("command should be: -get <src> <localdst>")
+            self.error.append("command should be: -get [-t threads] <src> ... <localdst>")
 
-        _args = (src_path, dest_path)
+        _args = (src_paths, dest_path)
+
+        return self.result_format(_args, options)
+
+
+class GetMergeOptionParser(OptionParserBase):
+
+    command = "-getmerge"
+
+    def parse(self, options_list):
+        opt_parser = CustomOptionParser(add_help_option=False)
+        # -nl  add a newline after each file, optparse only accepts it as --nl
+        opt_parser.add_option('--nl', action='store_true', default=False, dest='add_newline')
+        # -t  fetch N files at a time
+        opt_parser.add_option('-t', '--threads', action='store', type='int', default=None, dest='threads')
+        options, args = opt_parser.parse_args(["--nl" if arg == "-nl" else arg for arg in options_list])
+
+        paths = self._parse_multi_path_args(args)
+        src_paths = []
+        dest_path = None
+        if len(paths) >= 2:
+            src_paths, dest_path = paths[:-1], paths[-1]
+        else:
+            self.error.append("command should be: -getmerge [-nl] [-t threads] <src> ... <localdst>")
+
+        _args = (src_paths, dest_path)
 
         return self.result_format(_args, options)
 
@@ -127,18 +203,20 @@ class PutOptionParser(OptionParserBase):
 
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
+        # -t  transfer files on N threads
+        opt_parser.add_option('-t', '--threads', action='store', type='int', default=None, dest='threads')
         options, args = opt_parser.parse_args(options_list)
 
         paths = self._parse_multi_path_args(args)
-        src_path = None
+        src_paths = []
         dest_path = None
-        if len(paths) == 2:
-            # src path and destination path
-            src_path, dest_path = tuple(paths)
+        if len(paths) >= 2 and isinstance(paths[-1], HdfsPath):
+            # src paths and destination path
+            src_paths, dest_path = paths[:-1], paths[-1]
         else:
-            self.error.append("command should be: -put <local path> <dest>")
+            self.error.append("command should be: -put [-t threads] <local path> ... <dest>")
 
-        _args = (src_path, dest_path)
+        _args = (src_paths, dest_path)
 
         return self.result_format(_args, options)
 
@@ -165,6 +243,8 @@ class CopyOptionParser(OptionParserBase):
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
         opt_parser.add_option('-f', '--force', action='store_true', default=False, dest='force')
+        # -t  copy files of a directory on N threads
+        opt_parser.add_option('-t', '--threads', action='store', type='int', default=None, dest='threads')
         options, args = opt_parser.parse_args(options_list)
         paths = self._parse_multi_path_args(args)
 
@@ -174,7 +254,7 @@ class CopyOptionParser(OptionParserBase):
             # src path and destination path
             src_path, dest_path = tuple(paths)
         else:
-            self.error.append("command should be: -cp [-f] <src> <dest>")
+            self.error.append("command should be: -cp [-f] [-t threads] <src> <dest>")
 
         _args = (src_path, dest_path)
 
@@ -224,18 +304,18 @@ class ChangeModeOptionParser(OptionParserBase):
 
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
-        #opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
+        opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
         options, args = opt_parser.parse_args(options_list)
-        if len(args) != 2:
+        if len(args) < 2:
             raise OptionParsingError("-chmod: Not enough arguments: expected 2 but got %s" % len(args))
 
-        octal_mode, path_args = tuple(args)
+        octal_mode, path_args = args[0], args[1:]
         pattern = r"[0-7]{3}"
 
         if len(octal_mode) != 3 or not re.findall(pattern, octal_mode):
             raise OptionParsingError("-chmod:  mode '%s' does not match the expected pattern." % octal_mode)
 
-        paths = self._parse_multi_path_args([path_args])
+        paths = self._parse_multi_path_args(path_args)
         _args = (octal_mode, paths, )
 
         return self.result_format(_args, options)
@@ -247,14 +327,14 @@ class ChangeOwnerOptionParser(OptionParserBase):
 
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
-        #opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
+        opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
         options, args = opt_parser.parse_args(options_list)
-        if len(args) != 2:
+        if len(args) < 2:
             raise OptionParsingError("-chown: Not enough arguments: expected 2 but got %s" % len(args))
 
-        owner, path_args = tuple(args)
+        owner, path_args = args[0], args[1:]
 
-        paths = self._parse_multi_path_args([path_args])
+        paths = self._parse_multi_path_args(path_args)
         _args = (owner, paths, )
 
         return self.result_format(_args, options)
@@ -266,14 +346,14 @@ class ChangeGroupOptionParser(OptionParserBase):
 
     def parse(self, options_list):
         opt_parser = CustomOptionParser(add_help_option=False)
-        #opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
+        opt_parser.add_option('-R', '--recursively', action='store_true', default=False, dest='recursively')
         options, args = opt_parser.parse_args(options_list)
-        if len(args) != 2:
+        if len(args) < 2:
             raise OptionParsingError("-chgrp: Not enough arguments: expected 2 but got %s" % len(args))
 
-        group, path_args = tuple(args)
+        group, path_args = args[0], args[1:]
 
-        paths = self._parse_multi_path_args([path_args])
+        paths = self._parse_multi_path_args(path_args)
         _args = (group, paths, )
 
         return self.result_format(_args, options)
@@ -287,14 +367,97 @@ class CountOptionParser(OptionParserBase):
         opt_parser = CustomOptionParser(add_help_option=False)
         opt_parser.add_option('-q', '--quota', action='store_true', default=False, dest='quota')
         opt_parser.add_option('-h', '--humanized', action='store_true', default=False, dest='humanized')
+        # -v  show hadoop header names
+        opt_parser.add_option('-v', '--header', action='store_true', default=False, dest='header')
+        options, args = opt_parser.parse_args(options_list)
+
+        paths = self._parse_multi_path_args(args)
+        _args = (paths, )
+
+        return self.result_format(_args, options)
+
+
+class CatOptionParser(OptionParserBase):
+
+    command = "-cat"
+
+    def parse(self, options_list):
+        opt_parser = CustomOptionParser(add_help_option=False)
+        options, args = opt_parser.parse_args(options_list)
+
+        paths = self._parse_multi_path_args(args)
+        if not paths:
+            self.error.append("command should be: %s <src> ..." % self.command)
+        _args = (paths, )
+
+        return self.result_format(_args, options)
+
+
+class HeadOptionParser(OptionParserBase):
+
+    command = "-head"
+
+    def parse(self, options_list):
+        opt_parser = CustomOptionParser(add_help_option=False)
+        # -c  show N bytes, -n  show N lines
+        opt_parser.add_option('-c', '--bytes', action='store', type='int', default=None, dest='bytes_count')
+        opt_parser.add_option('-n', '--lines', action='store', type='int', default=None, dest='lines_count')
+        options, args = opt_parser.parse_args(options_list)
+
+        paths = self._parse_multi_path_args(args)
+        if not paths:
+            self.error.append("command should be: %s [-c bytes | -n lines] <src> ..." % self.command)
+        _args = (paths, )
+
+        return self.result_format(_args, options)
+
+
+class TailOptionParser(HeadOptionParser):
+
+    command = "-tail"
+
+
+class TextOptionParser(HeadOptionParser):
+
+    command = "-text"
+
+
+class SchemaOptionParser(OptionParserBase):
+
+    command = "-schema"
+
+    def parse(self, options_list):
+        opt_parser = CustomOptionParser(add_help_option=False)
+        opt_parser.add_option('-h', '--humanized', action='store_true', default=False, dest='humanized')
+        # -s  one row per file instead of one row per column
+        opt_parser.add_option('-s', '--summary', action='store_true', default=False, dest='summary')
         options, args = opt_parser.parse_args(options_list)
 
         paths = self._parse_multi_path_args(args)
+        if not paths:
+            self.error.append("command should be: -schema [-s] [-h] <path> ...")
         _args = (paths, )
 
         return self.result_format(_args, options)
 
 
+class PageOptionParser(OptionParserBase):
+
+    command = "-page"
+
+    def parse(self, options_list):
+        opt_parser = CustomOptionParser(add_help_option=False)
+        options, args = opt_parser.parse_args(options_list)
+        if not 1 <= len(args) <= 2 or not all(arg.isdigit() and int(arg) > 0 for arg in args):
+            raise OptionParsingError("command should be: -page <page> [<result id>]")
+
+        page = int(args[0])
+        result_id = int(args[1]) if len(args) == 2 else None
+        _args = (page, result_id)
+
+        return self.result_format(_args, options)
+
+
 class HelpOptionParser(OptionParserBase):
 
     command = "-help"
@@ -306,7 +469,9 @@ class OptionParserProxy(object):
     mapper = {
         "-ls": ListOptionParser,
         "-du": DuOptionParser,
+        "-find": FindOptionParser,
         "-get": GetOptionParser,
+        "-getmerge": GetMergeOptionParser,
         "-put": PutOptionParser,
         "-copyFromLocal": PutOptionParser,
         "-mkdir": MkdirOptionParser,
@@ -317,6 +482,12 @@ class OptionParserProxy(object):
         "-chown": ChangeOwnerOptionParser,
         "-chgrp": ChangeGroupOptionParser,
         "-count": CountOptionParser,
+        "-cat": CatOptionParser,
+        "-head": HeadOptionParser,
+        "-tail": TailOptionParser,
+        "-text": TextOptionParser,
+        "-schema": SchemaOptionParser,
+        "-page": PageOptionParser,
         "-help": HelpOptionParser
     }
 
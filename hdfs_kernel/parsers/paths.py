@@ -5,6 +5,7 @@
 # Time: 2019/09/30
 
 import re
+import fnmatch
 from hdfs_kernel.constants import HDFS_PREFIX, RESOLVED_PREFIX
 import hdfs_kernel.utils.configuration as config
 
@@ -20,6 +21,52 @@ def is_hdfs_path(path):
 
     return True
 
+def has_glob(path):
+    """
+        path contains *, ?, [...] or {a,b}
+    """
+    return bool(re.search(r"[*?\[{]", path))
+
+
+def expand_braces(pattern):
+    """
+        "/a/{b,c}/d{1,2}" -> ["/a/b/d1", "/a/b/d2", "/a/c/d1", "/a/c/d2"]
+    """
+    start = pattern.find("{")
+    if start < 0:
+        return [pattern]
+
+    depth = 0
+    options = []
+    last = start + 1
+    for index in range(start, len(pattern)):
+        char = pattern[index]
+        if char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                options.append(pattern[last:index])
+                head, tail = pattern[:start], pattern[index + 1:]
+                expanded = []
+                for option in options:
+                    expanded.extend(expand_braces(head + option + tail))
+                return expanded
+        elif char == "," and depth == 1:
+            options.append(pattern[last:index])
+            last = index + 1
+
+    # unbalanced brace, keep it literal
+    return [pattern]
+
+
+def glob_to_regex(component):
+    """
+        compile one path component, hadoop style [^...] is accepted
+    """
+    return re.compile(fnmatch.translate(component.replace("[^", "[!")))
+
+
 def is_local_path(path):
     pattern = r"([./|/][a-zA-Z\./]*[\s]?)"
     return re.findall(pattern, path)
@@ -49,6 +49,11 @@ def web_hdfs_name_services():
 def default_name_service():
     return None
 
+@_with_override
+def prewarm_sessions():
+    # sessions created at kernel start: "default", "all" nameservices or "none"
+    return "default"
+
 @_with_override
 def session_configs():
     return {}
@@ -60,6 +65,165 @@ def user_workspace():
     return workspace
 
 
+@_with_override
+def default_copy_threads():
+    return 1
+
+@_with_override
+def max_transfer_threads():
+    return 64
+
+@_with_override
+def transfer_threads():
+    return 4
+
+@_with_override
+def copy_chunk_size():
+    return 1024 * 1024 * 4
+
+@_with_override
+def copy_queue_depth():
+    return 2
+
+@_with_override
+def parallel_download_threshold():
+    return 1024 * 1024 * 256
+
+@_with_override
+def download_range_size():
+    return 1024 * 1024 * 64
+
+@_with_override
+def download_threads():
+    return 8
+
+@_with_override
+def parallel_upload_threshold():
+    return 1024 * 1024 * 512
+
+@_with_override
+def upload_part_size():
+    # keep it a multiple of the hdfs block size, CONCAT requires full blocks
+    return 1024 * 1024 * 256
+
+@_with_override
+def upload_threads():
+    return 8
+
+@_with_override
+def getmerge_spool_size():
+    # a part bigger than this is buffered in a temp file instead of memory
+    return 1024 * 1024 * 16
+
+
+@_with_override
+def walker_threads():
+    return 8
+
+@_with_override
+def summary_threads():
+    # content summaries in flight, each one walks a subtree on the namenode
+    return 16
+
+@_with_override
+def metadata_threads():
+    return 16
+
+@_with_override
+def metadata_ops_per_second():
+    # SETPERMISSION/SETOWNER calls of a recursive -chmod/-chown/-chgrp
+    return 500
+
+@_with_override
+def max_reported_failures():
+    return 20
+
+@_with_override
+def cancel_grace_seconds():
+    # how long an interrupted command may take to reach its next check
+    return 5
+
+@_with_override
+def progress_interval():
+    # min seconds between two progress display updates
+    return 0.5
+
+@_with_override
+def partial_result_interval():
+    return 1.0
+
+@_with_override
+def partial_result_rows():
+    return 100
+
+@_with_override
+def metadata_cache_ttl():
+    return 10
+
+@_with_override
+def metadata_cache_size():
+    return 10000
+
+@_with_override
+def metadata_cache_max_listing():
+    return 10000
+
+@_with_override
+def completion_cache_ttl():
+    # tab completion tolerates older listings than commands
+    return 60
+
+@_with_override
+def completion_cache_max_listing():
+    return 100000
+
+@_with_override
+def completion_timeout():
+    # max seconds a completion waits for a listing
+    return 1.0
+
+@_with_override
+def completion_max_matches():
+    return 1000
+
+@_with_override
+def inspect_cache_ttl():
+    return 30
+
+@_with_override
+def inspect_cache_size():
+    return 1000
+
+@_with_override
+def inspect_timeout():
+    # max seconds an inspection waits for FileStatus and content summary
+    return 0.5
+
+
+@_with_override
+def text_max_bytes():
+    # hard cap on bytes -cat/-head/-tail send to the notebook
+    return 1024 * 1024
+
+@_with_override
+def text_default_bytes():
+    return 1024
+
+@_with_override
+def text_chunk_size():
+    return 1024 * 64
+
+
+@_with_override
+def footer_read_size():
+    # first tail read, most parquet/orc footers fit
+    return 1024 * 64
+
+@_with_override
+def footer_threads():
+    return 16
+
+
 @_with_override
 def logging_config():
     return {
@@ -114,8 +278,19 @@ def coerce_dataframe():
 
 @_with_override
 def default_maxrows():
+    # rows rendered per result page
     return 1000
 
+@_with_override
+def json_result():
+    # send each result page as columnar json for the kernel.js table too
+    return True
+
+@_with_override
+def result_store_size():
+    # large results kept for -page
+    return 10
+
 @_with_override
 def default_samplefraction():
     return 0.1
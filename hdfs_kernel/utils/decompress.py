@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Incremental decompressors used by -text
+"""
+
+import bz2
+import zlib
+import posixpath as psp
+
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = b"BZh"
+SNAPPY_FRAME_MAGIC = b"\xff\x06\x00\x00sNaPpY"
+
+# codecs without a reliable magic number
+CODEC_EXTENSIONS = {
+    ".gz": "gzip",
+    ".bz2": "bzip2",
+    ".deflate": "deflate",
+    ".snappy": "snappy",
+    ".sz": "snappy-framed"
+}
+
+
+class Decompressor(object):
+    """
+        feed compressed chunks, get back decompressed pieces
+        of at most piece_size bytes
+    """
+
+    def __init__(self, piece_size=1024 * 64):
+        self.piece_size = piece_size
+
+    def feed(self, data):
+        raise NotImplementedError
+
+
+class PlainDecompressor(Decompressor):
+
+    def feed(self, data):
+        if data:
+            yield data
+
+
+class ZlibDecompressor(Decompressor):
+    """
+        gzip (concatenated members too) or zlib/deflate streams
+    """
+
+    def __init__(self, wbits, piece_size=1024 * 64):
+        super(ZlibDecompressor, self).__init__(piece_size)
+        self.wbits = wbits
+        self._obj = zlib.decompressobj(wbits)
+
+    def feed(self, data):
+        while True:
+            piece = self._obj.decompress(data, self.piece_size)
+            if piece:
+                yield piece
+
+            if self._obj.eof:
+                data = self._obj.unused_data
+                self._obj = zlib.decompressobj(self.wbits)
+                if not data:
+                    break
+                continue
+
+            data = self._obj.unconsumed_tail
+            # a full piece may leave output pending inside zlib
+            if not data and len(piece) < self.piece_size:
+                break
+
+
+class Bzip2Decompressor(Decompressor):
+    """
+        bzip2 streams, concatenated streams too
+    """
+
+    def __init__(self, piece_size=1024 * 64):
+        super(Bzip2Decompressor, self).__init__(piece_size)
+        self._obj = bz2.BZ2Decompressor()
+
+    def feed(self, data):
+        while True:
+            piece = self._obj.decompress(data, self.piece_size)
+            if piece:
+                yield piece
+
+            if self._obj.eof:
+                data = self._obj.unused_data
+                self._obj = bz2.BZ2Decompressor()
+                if not data:
+                    break
+                continue
+
+            if self._obj.needs_input:
+                break
+            data = b""
+
+
+class SnappyFrameDecompressor(Decompressor):
+    """
+        snappy framing format (python-snappy, .sz),
+        chunk checksums are not verified
+    """
+
+    def __init__(self, piece_size=1024 * 64):
+        super(SnappyFrameDecompressor, self).__init__(piece_size)
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        self._buffer += data
+        while len(self._buffer) >= 4:
+            kind = self._buffer[0]
+            size = int.from_bytes(self._buffer[1:4], "little")
+            if len(self._buffer) < 4 + size:
+                break
+
+            body = bytes(self._buffer[4:4 + size])
+            del self._buffer[:4 + size]
+            if kind == 0x00:
+                # masked crc32c + compressed data
+                yield snappy_uncompress(body[4:])
+            elif kind == 0x01:
+                # masked crc32c + raw data
+                yield body[4:]
+            elif kind == 0xff or kind >= 0x80:
+                # stream identifier or padding
+                continue
+            else:
+                raise ValueError("unsupported snappy chunk type %#x" % kind)
+
+
+class HadoopSnappyDecompressor(Decompressor):
+    """
+        hadoop SnappyCodec block stream, each block is
+        [uncompressed length] then [compressed length][snappy data] ...
+        until the uncompressed length is reached
+    """
+
+    def __init__(self, piece_size=1024 * 64):
+        super(HadoopSnappyDecompressor, self).__init__(piece_size)
+        self._buffer = bytearray()
+        # uncompressed bytes left in the current block, None between blocks
+        self._remaining = None
+
+    def feed(self, data):
+        self._buffer += data
+        while len(self._buffer) >= 4:
+            size = int.from_bytes(self._buffer[:4], "big")
+            if self._remaining is None:
+                self._remaining = size
+                del self._buffer[:4]
+            elif len(self._buffer) >= 4 + size:
+                piece = snappy_uncompress(bytes(self._buffer[4:4 + size]))
+                del self._buffer[:4 + size]
+                self._remaining -= len(piece)
+                yield piece
+            else:
+                break
+
+            if self._remaining is not None and self._remaining <= 0:
+                self._remaining = None
+
+
+def snappy_uncompress(data):
+    """
+        decode one raw snappy block
+    """
+    length, pos, shift = 0, 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        length |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            break
+        shift += 7
+
+    out = bytearray()
+    while pos < len(data):
+        tag = data[pos]
+        pos += 1
+        kind = tag & 3
+        if kind == 0:
+            # literal, long lengths follow the tag
+            size = tag >> 2
+            if size >= 60:
+                extra = size - 59
+                size = int.from_bytes(data[pos:pos + extra], "little")
+                pos += extra
+            size += 1
+            out += data[pos:pos + size]
+            pos += size
+            continue
+
+        if kind == 1:
+            size = ((tag >> 2) & 7) + 4
+            offset = ((tag >> 5) << 8) | data[pos]
+            pos += 1
+        elif kind == 2:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 2], "little")
+            pos += 2
+        else:
+            size = (tag >> 2) + 1
+            offset = int.from_bytes(data[pos:pos + 4], "little")
+            pos += 4
+
+        if offset == 0 or offset > len(out):
+            raise ValueError("corrupt snappy block")
+
+        start = len(out) - offset
+        if size <= offset:
+            out += out[start:start + size]
+        else:
+            # overlapping copy repeats the last `offset` bytes
+            pattern = out[start:]
+            out += (pattern * (size // offset + 1))[:size]
+
+    if len(out) != length:
+        raise ValueError("corrupt snappy block, expected %s bytes got %s" % (length, len(out)))
+    return bytes(out)
+
+
+def detect_codec(path, head):
+    """
+        magic bytes first, then the file extension
+        @params head first bytes of the file
+        @return codec name or None for plain data
+    """
+    if head.startswith(GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(BZIP2_MAGIC):
+        return "bzip2"
+    if head.startswith(SNAPPY_FRAME_MAGIC):
+        return "snappy-framed"
+
+    _, extension = psp.splitext(path)
+    return CODEC_EXTENSIONS.get(extension.lower())
+
+
+def get_decompressor(path, head, piece_size=1024 * 64):
+    codec = detect_codec(path, head)
+    if codec == "gzip":
+        return ZlibDecompressor(16 + zlib.MAX_WBITS, piece_size)
+    if codec == "deflate":
+        return ZlibDecompressor(zlib.MAX_WBITS, piece_size)
+    if codec == "bzip2":
+        return Bzip2Decompressor(piece_size)
+    if codec == "snappy":
+        return HadoopSnappyDecompressor(piece_size)
+    if codec == "snappy-framed":
+        return SnappyFrameDecompressor(piece_size)
+    return PlainDecompressor(piece_size)
@@ -0,0 +1,374 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Parquet and ORC footer decoding from the tail bytes of a file
+"""
+
+import zlib
+import struct
+from collections import OrderedDict
+from hdfs_kernel.utils.decompress import snappy_uncompress
+
+PARQUET_MAGIC = b"PAR1"
+ORC_MAGIC = b"ORC"
+
+PARQUET_TYPES = ["BOOLEAN", "INT32", "INT64", "INT96", "FLOAT",
+                 "DOUBLE", "BYTE_ARRAY", "FIXED_LEN_BYTE_ARRAY"]
+PARQUET_CONVERTED_TYPES = ["UTF8", "MAP", "MAP_KEY_VALUE", "LIST", "ENUM", "DECIMAL",
+                           "DATE", "TIME_MILLIS", "TIME_MICROS", "TIMESTAMP_MILLIS",
+                           "TIMESTAMP_MICROS", "UINT_8", "UINT_16", "UINT_32", "UINT_64",
+                           "INT_8", "INT_16", "INT_32", "INT_64", "JSON", "BSON", "INTERVAL"]
+PARQUET_REPETITIONS = ["REQUIRED", "OPTIONAL", "REPEATED"]
+
+ORC_KINDS = ["boolean", "tinyint", "smallint", "int", "bigint", "float", "double",
+             "string", "binary", "timestamp", "array", "map", "struct", "uniontype",
+             "decimal", "date", "varchar", "char", "timestamp with local time zone"]
+ORC_COMPRESSIONS = ["NONE", "ZLIB", "SNAPPY", "LZO", "LZ4", "ZSTD"]
+
+
+class FooterError(ValueError):
+    pass
+
+
+def _read_varint(data, pos):
+    value, shift = 0, 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+class ThriftCompactReader(object):
+    """
+        minimal thrift compact protocol decoder,
+        structs are returned as {field id: value}
+    """
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def read_struct(self):
+        fields = {}
+        last_id = 0
+        while True:
+            header = self._byte()
+            if header == 0:
+                return fields
+
+            field_type = header & 0x0f
+            delta = header >> 4
+            if delta:
+                field_id = last_id + delta
+            else:
+                field_id = _zigzag(self._varint())
+            last_id = field_id
+
+            if field_type in (1, 2):
+                # booleans live in the field header
+                fields[field_id] = field_type == 1
+            else:
+                fields[field_id] = self._read_value(field_type)
+
+    def _read_value(self, field_type):
+        if field_type in (1, 2):
+            return self._byte() == 1
+        if field_type == 3:
+            return struct.unpack("b", bytes([self._byte()]))[0]
+        if field_type in (4, 5, 6):
+            return _zigzag(self._varint())
+        if field_type == 7:
+            value = struct.unpack_from("<d", self.data, self.pos)[0]
+            self.pos += 8
+            return value
+        if field_type == 8:
+            size = self._varint()
+            value = bytes(self.data[self.pos:self.pos + size])
+            self.pos += size
+            return value
+        if field_type in (9, 10):
+            header = self._byte()
+            size = header >> 4
+            if size == 15:
+                size = self._varint()
+            return [self._read_value(header & 0x0f) for _ in range(size)]
+        if field_type == 11:
+            size = self._varint()
+            if not size:
+                return {}
+            types = self._byte()
+            return dict((self._read_value(types >> 4), self._read_value(types & 0x0f))
+                        for _ in range(size))
+        if field_type == 12:
+            return self.read_struct()
+        raise FooterError("unknown thrift type %s" % field_type)
+
+    def _byte(self):
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def _varint(self):
+        value, self.pos = _read_varint(self.data, self.pos)
+        return value
+
+
+def read_protobuf(data):
+    """
+        minimal protobuf decoder
+        @return {field number: [values]}, messages and strings stay bytes
+    """
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack_from("<Q", data, pos)[0]
+            pos += 8
+        elif wire_type == 2:
+            size, pos = _read_varint(data, pos)
+            value = bytes(data[pos:pos + size])
+            pos += size
+        elif wire_type == 5:
+            value = struct.unpack_from("<I", data, pos)[0]
+            pos += 4
+        else:
+            raise FooterError("unsupported protobuf wire type %s" % wire_type)
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def _read_packed_varints(values):
+    # repeated uint32 may be packed or not
+    result = []
+    for value in values:
+        if isinstance(value, bytes):
+            pos = 0
+            while pos < len(value):
+                item, pos = _read_varint(value, pos)
+                result.append(item)
+        else:
+            result.append(value)
+    return result
+
+
+def _first(fields, number, default=None):
+    values = fields.get(number)
+    return values[0] if values else default
+
+
+def detect_format(tail):
+    """
+        @return "parquet", "orc" or None
+    """
+    if tail.endswith(PARQUET_MAGIC):
+        return "parquet"
+    if tail and len(tail) > tail[-1]:
+        postscript = tail[-1 - tail[-1]:-1]
+        try:
+            if _first(read_protobuf(postscript), 8000) == ORC_MAGIC:
+                return "orc"
+        except (IndexError, FooterError, struct.error):
+            pass
+    return None
+
+
+def footer_size(tail):
+    """
+        @return number of tail bytes the footer needs
+    """
+    file_format = detect_format(tail)
+    if file_format == "parquet":
+        return struct.unpack("<I", tail[-8:-4])[0] + 8
+    if file_format == "orc":
+        ps_length = tail[-1]
+        postscript = read_protobuf(tail[-1 - ps_length:-1])
+        return 1 + ps_length + _first(postscript, 1, 0) + _first(postscript, 5, 0)
+    raise FooterError("not a parquet or orc file")
+
+
+def parse_footer(tail):
+    """
+        @return {"format", "rowGroups", "rows", "compressedSize",
+                 "uncompressedSize", "columns": [OrderedDict, ...]}
+    """
+    file_format = detect_format(tail)
+    if file_format == "parquet":
+        return _parse_parquet(tail)
+    if file_format == "orc":
+        return _parse_orc(tail)
+    raise FooterError("not a parquet or orc file")
+
+
+def _parse_parquet(tail):
+    metadata_length = struct.unpack("<I", tail[-8:-4])[0]
+    start = len(tail) - 8 - metadata_length
+    if start < 0:
+        raise FooterError("parquet footer is incomplete")
+    metadata = ThriftCompactReader(tail, start).read_struct()
+
+    # per column sizes summed over row groups
+    sizes = {}
+    row_groups = metadata.get(4, [])
+    compressed_total = 0
+    uncompressed_total = 0
+    for row_group in row_groups:
+        compressed = 0
+        for chunk in row_group.get(1, []):
+            meta = chunk.get(3, {})
+            name = ".".join(part.decode("utf-8", "replace") for part in meta.get(3, []))
+            column = sizes.setdefault(name, [0, 0])
+            column[0] += meta.get(7, 0)
+            column[1] += meta.get(6, 0)
+            compressed += meta.get(7, 0)
+        compressed_total += row_group.get(6, compressed)
+        uncompressed_total += row_group.get(2, 0)
+
+    columns = []
+    for name, element in _parquet_leaves(metadata.get(2, [])):
+        d = OrderedDict()
+        d['column'] = name
+        d['type'] = _parquet_type_name(element)
+        d['repetition'] = PARQUET_REPETITIONS[element.get(3, 0)]
+        d['compressedSize'], d['uncompressedSize'] = sizes.get(name, (None, None))
+        columns.append(d)
+
+    return {
+        "format": "parquet",
+        "rowGroups": len(row_groups),
+        "rows": metadata.get(3, 0),
+        "compressedSize": compressed_total,
+        "uncompressedSize": uncompressed_total,
+        "columns": columns
+    }
+
+
+def _parquet_leaves(schema):
+    """
+        the schema is a depth first list, groups carry num_children
+        @return [(dotted name, SchemaElement)] of leaf columns
+    """
+    leaves = []
+
+    def walk(index, prefix):
+        element = schema[index]
+        name = element.get(4, b"").decode("utf-8", "replace")
+        path = prefix + [name] if index else prefix
+        index += 1
+        children = element.get(5)
+        if not children:
+            leaves.append((".".join(path), element))
+            return index
+        for _ in range(children):
+            index = walk(index, path)
+        return index
+
+    if schema:
+        walk(0, [])
+    return leaves
+
+
+def _parquet_type_name(element):
+    name = PARQUET_TYPES[element[1]] if 1 in element else "GROUP"
+    if 6 in element and element[6] < len(PARQUET_CONVERTED_TYPES):
+        converted = PARQUET_CONVERTED_TYPES[element[6]]
+        if converted == "DECIMAL":
+            converted = "DECIMAL(%s,%s)" % (element.get(8), element.get(7, 0))
+        name = "%s (%s)" % (name, converted)
+    return name
+
+
+def _parse_orc(tail):
+    ps_length = tail[-1]
+    postscript = read_protobuf(tail[-1 - ps_length:-1])
+    footer_length = _first(postscript, 1, 0)
+    compression = _first(postscript, 2, 0)
+    end = len(tail) - 1 - ps_length
+    if end - footer_length < 0:
+        raise FooterError("orc footer is incomplete")
+
+    footer = read_protobuf(_orc_decompress(tail[end - footer_length:end], compression))
+    types = [read_protobuf(item) for item in footer.get(4, [])]
+    stripes = [read_protobuf(item) for item in footer.get(3, [])]
+
+    columns = []
+    if types:
+        root = types[0]
+        names = [name.decode("utf-8", "replace") for name in root.get(3, [])]
+        for name, subtype in zip(names, _read_packed_varints(root.get(2, []))):
+            d = OrderedDict()
+            d['column'] = name
+            d['type'] = _orc_type_name(types, subtype)
+            d['repetition'] = "OPTIONAL"
+            # column sizes live in the stripe footers, not in the file footer
+            d['compressedSize'] = None
+            d['uncompressedSize'] = None
+            columns.append(d)
+
+    return {
+        "format": "orc",
+        "rowGroups": len(stripes),
+        "rows": _first(footer, 6, 0),
+        "compressedSize": _first(footer, 2, 0),
+        "uncompressedSize": None,
+        "columns": columns
+    }
+
+
+def _orc_type_name(types, index):
+    orc_type = types[index]
+    kind = _first(orc_type, 1, 0)
+    name = ORC_KINDS[kind] if kind < len(ORC_KINDS) else "unknown"
+    subtypes = _read_packed_varints(orc_type.get(2, []))
+
+    if name == "struct":
+        names = [n.decode("utf-8", "replace") for n in orc_type.get(3, [])]
+        return "struct<%s>" % ",".join("%s:%s" % (n, _orc_type_name(types, t))
+                                       for n, t in zip(names, subtypes))
+    if name in ("array", "map", "uniontype"):
+        return "%s<%s>" % (name, ",".join(_orc_type_name(types, t) for t in subtypes))
+    if name == "decimal":
+        return "decimal(%s,%s)" % (_first(orc_type, 5, 38), _first(orc_type, 6, 10))
+    if name in ("varchar", "char"):
+        return "%s(%s)" % (name, _first(orc_type, 4, 0))
+    return name
+
+
+def _orc_decompress(data, compression):
+    """
+        orc compressed streams are chunks with a 3 byte header,
+        length << 1 | is_original
+    """
+    if compression == 0:
+        return data
+
+    out = bytearray()
+    pos = 0
+    while pos + 3 <= len(data):
+        header = data[pos] | data[pos + 1] << 8 | data[pos + 2] << 16
+        pos += 3
+        chunk = data[pos:pos + (header >> 1)]
+        pos += header >> 1
+        if header & 1:
+            out += chunk
+        elif compression == 1:
+            out += zlib.decompress(chunk, -zlib.MAX_WBITS)
+        elif compression == 2:
+            out += snappy_uncompress(chunk)
+        else:
+            raise FooterError("orc %s compression is not supported" % ORC_COMPRESSIONS[compression])
+    return bytes(out)
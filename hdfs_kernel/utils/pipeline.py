@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Overlap reading and writing of a chunked byte stream
+"""
+
+import threading
+from queue import Queue, Empty, Full
+
+
+class ChunkPipeline(object):
+    """
+        reader thread fills a bounded queue of chunks, the caller drains it
+
+        with ChunkPipeline(lambda: client.read(path, chunk_size=size)) as chunks:
+            other_client.write(dest_path, data=chunks)
+    """
+
+    _end = object()
+    _poll_seconds = 0.1
+
+    def __init__(self, open_reader, queue_depth=2):
+        """
+            @params open_reader callable returning a context manager
+                    which yields a chunk generator
+            @params queue_depth max chunks buffered ahead of the writer
+        """
+        self.open_reader = open_reader
+        self._queue = Queue(maxsize=max(1, queue_depth))
+        self._stop = threading.Event()
+        self._opened = threading.Event()
+        self._error = None
+        self._thread = None
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._read, name="hdfs-pipeline-reader")
+        self._thread.daemon = True
+        self._thread.start()
+
+        # fail before the caller starts writing if the source can't be opened
+        self._opened.wait()
+        if self._error is not None:
+            self._thread.join()
+            raise self._error
+
+        return self._drain()
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=self._poll_seconds)
+                return True
+            except Full:
+                continue
+        return False
+
+    def _read(self):
+        try:
+            with self.open_reader() as reader:
+                self._opened.set()
+                for chunk in reader:
+                    if not self._put(chunk):
+                        # writer gave up
+                        return
+        except Exception as e:
+            self._error = e
+        finally:
+            self._opened.set()
+            self._put(self._end)
+
+    def _drain(self):
+        while True:
+            try:
+                chunk = self._queue.get(timeout=self._poll_seconds)
+            except Empty:
+                if not self._thread.is_alive() and self._queue.empty():
+                    break
+                continue
+
+            if chunk is self._end:
+                break
+            yield chunk
+
+        if self._error is not None:
+            raise self._error
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding=utf-8 -*-
+#
+# Author: huangnj
+# Time: 2019/10/08
+
+"""
+    Kernel side store of large results, pages are served from here
+"""
+
+from threading import Lock
+from collections import OrderedDict
+
+
+class ResultStore(object):
+    """
+        keep the last `maxsize` results by id, the oldest is dropped first
+    """
+
+    def __init__(self, maxsize=10):
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+        self._lock = Lock()
+
+    def put(self, result_id, df):
+        with self._lock:
+            self._results[result_id] = df
+            self._results.move_to_end(result_id)
+            while len(self._results) > self.maxsize:
+                self._results.popitem(last=False)
+
+    def get(self, result_id=None):
+        """
+            @params result_id None for the latest result
+            @return (result id, DataFrame) or (None, None)
+        """
+        with self._lock:
+            if not self._results:
+                return None, None
+            if result_id is None:
+                result_id = next(reversed(self._results))
+            return result_id, self._results.get(result_id)
+
+    def page_count(self, df, page_size):
+        return max(1, -(-len(df) // page_size))
+
+    def page(self, df, page, page_size):
+        """
+            @params page 1 based page number
+        """
+        start = (page - 1) * page_size
+        return df.iloc[start:start + page_size]
@@ -5,7 +5,12 @@
 # Time: 2019/10/08
 
 
+import sys
 import math
+import time
+from threading import Lock, Event
+from hdfs_kernel.exceptions import CommandCancelledException
+from concurrent.futures import ThreadPoolExecutor
 
 def convert_size_readable(size_bytes):
     if size_bytes == 0:
@@ -16,3 +21,137 @@ def convert_size_readable(size_bytes):
     p = math.pow(1024, i)
     s = round(size_bytes / p, 2)
     return "%s %s" % (s, size_name[i])
+
+
+_pandas_lock = Lock()
+_pandas_configured = False
+
+
+def import_pandas():
+    """
+        pandas is imported with the first tabular result,
+        it is most of the kernel import time
+    """
+    global _pandas_configured
+    # waits on the import lock while another thread is still loading pandas,
+    # sys.modules holds the module before it is fully initialised
+    import pandas
+    if not _pandas_configured:
+        with _pandas_lock:
+            if not _pandas_configured:
+                # set dataframe max_colwidth
+                pandas.set_option("max_colwidth", 240)
+                _pandas_configured = True
+    return pandas
+
+
+def is_dataframe(obj):
+    # without pandas imported nothing can be a DataFrame, a module still
+    # loading in another thread may not have DataFrame yet
+    dataframe_class = getattr(sys.modules.get("pandas"), "DataFrame", None)
+    return dataframe_class is not None and isinstance(obj, dataframe_class)
+
+
+def map_in_pool(func, items, max_workers):
+    """
+        apply func to every item on a bounded thread pool
+        an exception raised for one item does not stop the others
+        @params func callable with one argument
+        @params items iterable of arguments
+        @params max_workers pool size
+        @return list of (item, result, exception) in input order
+    """
+    items = list(items)
+    max_workers = max(1, min(max_workers, len(items) or 1))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+
+    result = []
+    for item, future in zip(items, futures):
+        error = future.exception()
+        value = None if error else future.result()
+        result.append((item, value, error))
+
+    return result
+
+
+class RateLimiter(object):
+    """
+        token bucket shared by worker threads,
+        acquire() blocks until the caller may send one request
+    """
+
+    def __init__(self, rate):
+        """
+            @params rate requests per second, 0 or None for unlimited
+        """
+        self.rate = rate
+        self._tokens = float(rate or 0)
+        self._updated = time.monotonic()
+        self._lock = Lock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.rate, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # take the token now, a negative balance is the time to wait for it
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+
+        if wait:
+            time.sleep(wait)
+
+
+class CancellationToken(object):
+    """
+        set by the kernel on interrupt, commands call check()
+        between chunks and files and stop with CommandCancelledException
+    """
+
+    def __init__(self):
+        self._event = Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise CommandCancelledException("interrupted")
+
+
+class SingleFlight(object):
+    """
+        run calls on a small thread pool, a key already in flight
+        is not submitted again, callers share its future
+    """
+
+    def __init__(self, max_workers=2):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # {key: future}
+        self._pending = {}
+        self._lock = Lock()
+
+    def submit(self, key, func, *args):
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            future = self._executor.submit(func, *args)
+            self._pending[key] = future
+
+        # outside the lock, a finished future runs the callback right away
+        future.add_done_callback(lambda done: self._done(key, done))
+        return future
+
+    def _done(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]